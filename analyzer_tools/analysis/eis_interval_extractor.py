@@ -10,20 +10,42 @@ Supports two resolution modes:
 - Per-frequency: One interval per frequency measurement (fine, for detailed analysis)
 """
 
-import glob
+import copy
+import fnmatch
+import functools
+import itertools
 import json
+import os
 import re
+import sys
+import warnings
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Dict, List, Optional
 
 import click
+import numpy as np
+
+from analyzer_tools.utils.json_utils import orjson
+
+# "Nb header lines : 73"
+_NB_HEADER_LINES_RE = re.compile(r':\s*(\d+)')
+# "Acquisition started on : 04/20/2025 10:55:16.521"
+_ACQUISITION_START_RE = re.compile(r':\s*(\d{2}/\d{2}/\d{4}\s+\d{2}:\d{2}:\d{2}\.\d+)')
+_SEQUENCE_RE = re.compile(r'(sequence_\d+)')
+_CYCLE_SUFFIX_RE = re.compile(r'_C\d+_(\d+)\.mpt$')
+_FILE_NUMBER_RE = re.compile(r'_(\d+)\.mpt$')
 
 
 def parse_mpt_header(filepath: str) -> Dict[str, any]:
     """
     Parse the header of an EC-Lab .mpt file.
     
+    Results are cached per file and reused until the file's modification
+    time or size changes, so callers that need both the header and the data
+    only read the header once.
+    
     Args:
         filepath: Path to the .mpt file
         
@@ -33,28 +55,44 @@ def parse_mpt_header(filepath: str) -> Dict[str, any]:
         - 'acquisition_start': Datetime of acquisition start
         - 'column_names': List of column names
     """
+    stat = os.stat(filepath)
+    header_info = _parse_mpt_header_cached(os.path.abspath(filepath), stat.st_mtime_ns, stat.st_size)
+    # Callers get their own copy so the cached entry can't be modified
+    return copy.deepcopy(header_info)
+
+
+@functools.lru_cache(maxsize=512)
+def _parse_mpt_header_cached(filepath: str, mtime_ns: int, size: int) -> Dict[str, any]:
+    """Parse an .mpt header; mtime_ns and size only serve as the cache key."""
     header_info = {
         'num_header_lines': 0,
         'acquisition_start': None,
         'column_names': []
     }
     
-    with open(filepath, 'r', encoding='latin-1') as f:
-        lines = f.readlines()
+    # Split the header into lines as bytes and decode it once at the end;
+    # the data block is never read or decoded
+    with open(filepath, 'rb') as f:
+        raw_lines = list(itertools.islice(f, 10))
+        
+        # Find number of header lines
+        for raw_line in raw_lines:
+            if raw_line.startswith(b'Nb header lines'):
+                match = _NB_HEADER_LINES_RE.search(raw_line.decode('latin-1'))
+                if match:
+                    header_info['num_header_lines'] = int(match.group(1))
+                break
+        
+        # Read the rest of the header only, not the data block
+        if header_info['num_header_lines'] > len(raw_lines):
+            raw_lines.extend(itertools.islice(f, header_info['num_header_lines'] - len(raw_lines)))
     
-    # Find number of header lines
-    for line in lines[:10]:
-        if line.startswith('Nb header lines'):
-            match = re.search(r':\s*(\d+)', line)
-            if match:
-                header_info['num_header_lines'] = int(match.group(1))
-            break
+    lines = [raw_line.decode('latin-1') for raw_line in raw_lines]
     
     # Find acquisition start time
     for line in lines[:header_info['num_header_lines']]:
         if 'Acquisition started on' in line:
-            # Format: "Acquisition started on : 04/20/2025 10:55:16.521"
-            match = re.search(r':\s*(\d{2}/\d{2}/\d{4}\s+\d{2}:\d{2}:\d{2}\.\d+)', line)
+            match = _ACQUISITION_START_RE.search(line)
             if match:
                 time_str = match.group(1)
                 header_info['acquisition_start'] = datetime.strptime(
@@ -150,24 +188,83 @@ def parse_potential_steps_from_header(lines: List[str], num_header_lines: int) -
     return potential_steps if potential_steps else None
 
 
-def read_frequency_measurements(filepath: str) -> List[Dict]:
+def _load_numeric_columns(filepath: str, skiprows: int, usecols: List[int]) -> np.ndarray:
     """
-    Read individual frequency measurements from an EIS .mpt file.
+    Load selected columns of the tab-separated .mpt data block as floats.
+    
+    Uses numpy.loadtxt for the whole block. If any row is malformed (for
+    example a partially written last line while acquisition is running),
+    falls back to a tolerant line-by-line parse that stores NaN for fields
+    that are missing or not numeric.
     
     Args:
         filepath: Path to the .mpt file
+        skiprows: Number of header lines to skip
+        usecols: Column indices to load
         
     Returns:
-        List of dictionaries with timing, Ewe, and impedance data for each frequency measurement
+        Array of shape (n_rows, len(usecols))
+    """
+    try:
+        with warnings.catch_warnings():
+            # An empty data block is not an error here
+            warnings.simplefilter('ignore', UserWarning)
+            return np.loadtxt(filepath, delimiter='\t', skiprows=skiprows,
+                              usecols=usecols, encoding='latin-1', ndmin=2)
+    except ValueError:
+        pass
+    
+    rows = []
+    with open(filepath, 'r', encoding='latin-1') as f:
+        for line in itertools.islice(f, skiprows, None):
+            line = line.strip()
+            if not line:
+                continue
+            parts = line.split('\t')
+            row = []
+            for idx in usecols:
+                try:
+                    row.append(float(parts[idx]))
+                except (ValueError, IndexError):
+                    row.append(np.nan)
+            rows.append(row)
+    return np.array(rows, dtype=float).reshape(-1, len(usecols))
+
+
+def read_measurement_columns(filepath: str) -> Dict[str, np.ndarray]:
+    """
+    Read the frequency measurements of an EIS .mpt file as column arrays.
+    
+    Args:
+        filepath: Path to the .mpt file
+        
+    Returns:
+        Dictionary of equal-length float arrays keyed by 'frequency_hz',
+        'time_seconds', 'ewe_v', 'z_ohm', 'im_z_ohm', 'phase_deg' and 'ns'.
+        Missing values (and columns absent from the file) are NaN.
+        'wall_clock' holds the matching datetime64[us] timestamps and the
+        acquisition start time is stored under 'acquisition_start'.
+        
+    The parsed columns are cached per file until its modification time or
+    size changes, so per-file and per-frequency extraction over the same
+    directory only parse each file once. The arrays are shared between
+    callers and are therefore read-only.
     """
+    stat = os.stat(filepath)
+    # Callers get their own dict; the read-only arrays are shared
+    return dict(_read_measurement_columns_cached(
+        os.path.abspath(filepath), stat.st_mtime_ns, stat.st_size
+    ))
+
+
+@functools.lru_cache(maxsize=64)
+def _read_measurement_columns_cached(filepath: str, mtime_ns: int, size: int) -> Dict[str, np.ndarray]:
+    """Read .mpt columns; mtime_ns and size only serve as the cache key."""
     header_info = parse_mpt_header(filepath)
     
     if header_info['acquisition_start'] is None:
         raise ValueError(f"Could not find acquisition start time in {filepath}")
     
-    with open(filepath, 'r', encoding='latin-1') as f:
-        lines = f.readlines()
-    
     # Find column indices
     column_names = header_info['column_names']
     time_idx = column_names.index('time/s') if 'time/s' in column_names else 5
@@ -180,59 +277,88 @@ def read_frequency_measurements(filepath: str) -> List[Dict]:
                 return i
         return None
     
-    # Find column indices for EIS data
-    ewe_idx = find_column('<Ewe>/V')
-    z_idx = find_column('|Z|/Ohm')
-    im_z_idx = find_column('Im(Z)/Ohm')
-    phase_idx = find_column('Phase(Z)/deg')
-    ns_idx = find_column('Ns')  # Step number for multi-step files
+    # Column indices for each field (None when the column is absent)
+    field_columns = {
+        'frequency_hz': freq_idx,
+        'time_seconds': time_idx,
+        'ewe_v': find_column('<Ewe>/V'),
+        'z_ohm': find_column('|Z|/Ohm'),
+        'im_z_ohm': find_column('Im(Z)/Ohm'),
+        'phase_deg': find_column('Phase(Z)/deg'),
+        'ns': find_column('Ns'),  # Step number for multi-step files
+    }
     
-    measurements = []
-    data_lines = lines[header_info['num_header_lines']:]
+    usecols = sorted({idx for idx in field_columns.values() if idx is not None})
+    data = _load_numeric_columns(filepath, header_info['num_header_lines'], usecols)
     
-    def safe_float(parts: List[str], idx: Optional[int]) -> Optional[float]:
-        """Safely extract a float value from parts list."""
-        if idx is None or idx >= len(parts):
-            return None
-        try:
-            return float(parts[idx])
-        except ValueError:
-            return None
+    # Rows without a usable time or frequency are skipped
+    valid = ~(np.isnan(data[:, usecols.index(time_idx)]) | np.isnan(data[:, usecols.index(freq_idx)]))
+    data = data[valid]
     
-    for line in data_lines:
-        line = line.strip()
-        if not line:
-            continue
-            
-        parts = line.split('\t')
-        if len(parts) <= max(time_idx, freq_idx):
-            continue
+    columns = {}
+    for field, idx in field_columns.items():
+        if idx is None:
+            columns[field] = np.full(len(data), np.nan)
+        else:
+            columns[field] = data[:, usecols.index(idx)]
+    
+    # Wall-clock time of every measurement, computed in one datetime64 step.
+    # Whole seconds and the fraction are converted separately, the same way
+    # timedelta(seconds=t) does, so half-microsecond ties round identically.
+    acquisition_start = header_info['acquisition_start']
+    fraction, whole = np.modf(columns['time_seconds'])
+    offsets_us = (
+        whole.astype(np.int64) * 1_000_000 + np.rint(fraction * 1e6).astype(np.int64)
+    ).astype('timedelta64[us]')
+    columns['wall_clock'] = np.datetime64(acquisition_start, 'us') + offsets_us
+    for array in columns.values():
+        array.flags.writeable = False
+    columns['acquisition_start'] = acquisition_start
+    return columns
+
+
+def _read_columns_or_error(filepath: str):
+    """Return read_measurement_columns(filepath), or the exception it raised."""
+    try:
+        return read_measurement_columns(filepath)
+    except Exception as e:
+        return e
+
+
+def read_frequency_measurements(filepath: str) -> List[Dict]:
+    """
+    Read individual frequency measurements from an EIS .mpt file.
+    
+    Args:
+        filepath: Path to the .mpt file
         
-        try:
-            time_s = float(parts[time_idx])
-            freq_hz = float(parts[freq_idx])
-            wall_clock = header_info['acquisition_start'] + timedelta(seconds=time_s)
-            
-            # Get step number if available (for multi-step files)
-            ns_value = None
-            if ns_idx is not None and ns_idx < len(parts):
-                try:
-                    ns_value = int(float(parts[ns_idx]))
-                except ValueError:
-                    pass
-            
-            measurements.append({
-                'frequency_hz': freq_hz,
-                'time_seconds': time_s,
-                'wall_clock': wall_clock,
-                'ewe_v': safe_float(parts, ewe_idx),
-                'z_ohm': safe_float(parts, z_idx),
-                'im_z_ohm': safe_float(parts, im_z_idx),
-                'phase_deg': safe_float(parts, phase_idx),
-                'ns': ns_value
-            })
-        except (ValueError, IndexError):
-            continue
+    Returns:
+        List of dictionaries with timing, Ewe, and impedance data for each frequency measurement
+    """
+    columns = read_measurement_columns(filepath)
+    
+    def values(field: str) -> list:
+        """Return a column as a list, with None in place of NaN."""
+        # NaN is the only float that compares unequal to itself
+        return [v if v == v else None for v in columns[field].tolist()]
+    
+    ns_values = [None if v is None else int(v) for v in values('ns')]
+    
+    measurements = []
+    for time_s, wall_clock, freq_hz, ewe_v, z_ohm, im_z_ohm, phase_deg, ns_value in zip(
+        values('time_seconds'), columns['wall_clock'].tolist(), values('frequency_hz'),
+        values('ewe_v'), values('z_ohm'), values('im_z_ohm'), values('phase_deg'), ns_values,
+    ):
+        measurements.append({
+            'frequency_hz': freq_hz,
+            'time_seconds': time_s,
+            'wall_clock': wall_clock,
+            'ewe_v': ewe_v,
+            'z_ohm': z_ohm,
+            'im_z_ohm': im_z_ohm,
+            'phase_deg': phase_deg,
+            'ns': ns_value
+        })
     
     return measurements
 
@@ -302,6 +428,7 @@ def extract_label_for_step(
     return label
 
 
+@functools.lru_cache(maxsize=4096)
 def extract_label_from_filename(filename: str, pattern: str = None) -> str:
     """
     Extract a short label from an EIS filename.
@@ -316,10 +443,8 @@ def extract_label_from_filename(filename: str, pattern: str = None) -> str:
     Returns:
         A short label suitable for output naming
     """
-    import re
-    
     # Try to extract "sequence_N" pattern
-    seq_match = re.match(r'(sequence_\d+)', filename)
+    seq_match = _SEQUENCE_RE.match(filename)
     if seq_match:
         label = seq_match.group(1)
         
@@ -327,7 +452,7 @@ def extract_label_from_filename(filename: str, pattern: str = None) -> str:
         if pattern:
             # Extract the variable part from the pattern (e.g., "?" or "*")
             # Look for pattern like C02_N at the end
-            suffix_match = re.search(r'_C\d+_(\d+)\.mpt$', filename)
+            suffix_match = _CYCLE_SUFFIX_RE.search(filename)
             if suffix_match:
                 label = f"{label}_eis_{suffix_match.group(1)}"
         
@@ -340,6 +465,16 @@ def extract_label_from_filename(filename: str, pattern: str = None) -> str:
     return clean
 
 
+def _isoformat(times: np.ndarray) -> List[str]:
+    """Format a datetime64[us] array exactly like datetime.isoformat()."""
+    iso = np.datetime_as_string(times, unit='us')
+    # isoformat() leaves out the fraction when it is zero
+    whole_seconds = times.astype(np.int64) % 1_000_000 == 0
+    if whole_seconds.any():
+        iso[whole_seconds] = np.datetime_as_string(times[whole_seconds], unit='s')
+    return iso.tolist()
+
+
 def generate_hold_intervals(
     start_time: datetime,
     end_time: datetime,
@@ -358,33 +493,76 @@ def generate_hold_intervals(
     Returns:
         List of interval dictionaries
     """
+    one_us = timedelta(microseconds=1)
+    step_us = timedelta(seconds=interval_seconds) // one_us
+    if step_us <= 0:
+        raise ValueError(f"interval_seconds must be positive, got {interval_seconds}")
+    total_us = (end_time - start_time) // one_us
+    
+    # Offset of every slice start from start_time, in microseconds; the
+    # last slice is clamped to the end of the hold period
+    starts_us = np.arange(0, total_us, step_us)
+    ends_us = np.minimum(starts_us + step_us, total_us)
+    
+    # Only keep slices with a meaningful duration (at least 1 second)
+    keep = (ends_us - starts_us) >= 1_000_000
+    starts_us = starts_us[keep]
+    ends_us = ends_us[keep]
+    
+    # Slice boundaries as ISO strings, formatted straight from datetime64
+    origin = np.datetime64(start_time, 'us')
+    starts = _isoformat(origin + starts_us.astype('timedelta64[us]'))
+    ends = _isoformat(origin + ends_us.astype('timedelta64[us]'))
+    durations = ((ends_us - starts_us) / 1e6).tolist()
+    
     intervals = []
-    current_time = start_time
-    idx = 0
-    
-    while current_time < end_time:
-        next_time = current_time + timedelta(seconds=interval_seconds)
-        # Don't exceed the end time
-        if next_time > end_time:
-            next_time = end_time
-        
-        duration = (next_time - current_time).total_seconds()
-        # Only add if duration is meaningful (at least 1 second)
-        if duration >= 1.0:
-            intervals.append({
-                'label': f"{label_prefix}_{idx}",
-                'interval_type': 'hold',
-                'start': current_time.isoformat(),
-                'end': next_time.isoformat(),
-                'duration_seconds': duration
-            })
-            idx += 1
-        
-        current_time = next_time
+    for idx, (start, end, duration) in enumerate(zip(starts, ends, durations)):
+        intervals.append({
+            'label': f"{label_prefix}_{idx}",
+            'interval_type': 'hold',
+            'start': start,
+            'end': end,
+            'duration_seconds': duration
+        })
     
     return intervals
 
 
+def _find_mpt_files(data_dir: str, pattern: str, exclude: str) -> List[str]:
+    """
+    List the .mpt files in a directory, sorted by their trailing file number.
+    
+    The directory is scanned once with os.scandir and names are matched with
+    fnmatch, skipping hidden files the same way glob does.
+    
+    Args:
+        data_dir: Directory containing .mpt files
+        pattern: Glob pattern matched against file names
+        exclude: Exclude files containing this string
+        
+    Returns:
+        List of file paths, ordered by the N in their C02_N suffix
+    """
+    try:
+        with os.scandir(data_dir) as entries:
+            files = [
+                entry.path for entry in entries
+                if not entry.name.startswith('.')
+                and exclude not in entry.name
+                and fnmatch.fnmatch(entry.name, pattern)
+                and entry.is_file()
+            ]
+    except OSError:
+        return []
+    
+    # Sort numerically by extracting number from C02_N pattern
+    def extract_number(filepath: str) -> int:
+        match = _FILE_NUMBER_RE.search(filepath)
+        return int(match.group(1)) if match else 0
+    
+    return sorted(files, key=extract_number)
+
+
 def extract_per_file_intervals(
     data_dir: str,
     pattern: str = '*C02_?.mpt',
@@ -408,60 +586,69 @@ def extract_per_file_intervals(
         List of interval dictionaries
     """
     data_dir = Path(data_dir)
-    all_files = glob.glob(str(data_dir / pattern))
-    
-    # Sort numerically by extracting number from C02_N pattern
-    def extract_number(filepath: str) -> int:
-        match = re.search(r'_(\d+)\.mpt$', filepath)
-        return int(match.group(1)) if match else 0
-    
-    files = sorted([f for f in all_files if exclude not in Path(f).name], key=extract_number)
+    files = _find_mpt_files(data_dir, pattern, exclude)
     
     if not files:
         raise ValueError(f"No files found matching pattern {pattern} in {data_dir}")
     
+    # Read the files concurrently (mostly I/O wait on shared filesystems).
+    # Intervals are still assembled in file order below, since hold periods
+    # depend on the end time of the previous file.
+    with ThreadPoolExecutor(max_workers=min(8, len(files))) as pool:
+        all_columns = list(pool.map(_read_columns_or_error, files))
+    
     intervals = []
     prev_end_time = None
     acquisition_start = None
     hold_count = 0
     
-    for file_idx, filepath in enumerate(files):
+    for file_idx, (filepath, columns) in enumerate(zip(files, all_columns)):
         filename = Path(filepath).name
         if verbose:
             print(f"Processing: {filename}")
         
         try:
+            if isinstance(columns, Exception):
+                raise columns
+            
             # Get header info for acquisition start time (needed for hold intervals)
             header_info = parse_mpt_header(filepath)
             if acquisition_start is None and header_info['acquisition_start'] is not None:
                 acquisition_start = header_info['acquisition_start']
             
-            measurements = read_frequency_measurements(filepath)
-            if not measurements:
+            times = columns['time_seconds']
+            if len(times) == 0:
                 if verbose:
                     print("  Warning: No measurements found, skipping")
                 continue
             
+            def average_ewe(mask: np.ndarray) -> Optional[float]:
+                ewe = columns['ewe_v'][mask]
+                ewe = ewe[~np.isnan(ewe)]
+                # Sum left to right like the original list-based average
+                return sum(ewe.tolist()) / len(ewe) if len(ewe) else None
+            
             # Check if this is a multi-step file
             potential_steps = header_info.get('potential_steps')
-            if has_multiple_steps(measurements) and potential_steps:
+            ns = columns['ns']
+            step_numbers = np.unique(ns[~np.isnan(ns)])
+            if len(step_numbers) > 1 and potential_steps:
                 # Handle multi-step file: create one interval per potential step
                 if verbose:
                     print(f"  Multi-step file detected: {len(potential_steps)} steps")
                 
-                by_step = split_measurements_by_step(measurements)
-                
-                for step_num in sorted(by_step.keys()):
-                    step_measurements = by_step[step_num]
+                for step_num in step_numbers.astype(int).tolist():
+                    step_mask = ns == step_num
+                    step_times = times[step_mask]
+                    step_clock = columns['wall_clock'][step_mask]
                     step_info = potential_steps.get(step_num, {})
                     
-                    step_start = step_measurements[0]['wall_clock']
-                    step_end = step_measurements[-1]['wall_clock']
+                    step_start = step_clock[0].item()
+                    step_end = step_clock[-1].item()
                     step_duration = (step_end - step_start).total_seconds()
                     
                     # Calculate average Ewe for this step
-                    step_ewe_values = [m['ewe_v'] for m in step_measurements if m['ewe_v'] is not None]
-                    step_avg_ewe = sum(step_ewe_values) / len(step_ewe_values) if step_ewe_values else None
+                    step_avg_ewe = average_ewe(step_mask)
                     
                     # Generate hold intervals between steps if requested
                     if hold_interval is not None and prev_end_time is not None:
@@ -485,7 +672,7 @@ def extract_per_file_intervals(
                         e_v = step_info.get('E_V')
                         vs = step_info.get('vs', '')
                         e_str = f"{e_v:.3f}V vs {vs}" if e_v is not None else "unknown"
-                        print(f"    Step {step_num}: {e_str}, {len(step_measurements)} freq, {step_duration:.1f}s")
+                        print(f"    Step {step_num}: {e_str}, {len(step_times)} freq, {step_duration:.1f}s")
                     
                     interval_data = {
                         'label': label,
@@ -494,9 +681,9 @@ def extract_per_file_intervals(
                         'start': step_start.isoformat(),
                         'end': step_end.isoformat(),
                         'duration_seconds': step_duration,
-                        'n_frequencies': len(step_measurements),
-                        'first_time_s': step_measurements[0]['time_seconds'],
-                        'last_time_s': step_measurements[-1]['time_seconds'],
+                        'n_frequencies': len(step_times),
+                        'first_time_s': float(step_times[0]),
+                        'last_time_s': float(step_times[-1]),
                         'step_number': step_num,
                     }
                     
@@ -516,8 +703,8 @@ def extract_per_file_intervals(
             # Single-step file: use original logic
             # Use first and last measurement times as the actual file interval
             # (header acquisition_start is global experiment start, same for all files)
-            start_time = measurements[0]['wall_clock']
-            end_time = measurements[-1]['wall_clock']
+            start_time = columns['wall_clock'][0].item()
+            end_time = columns['wall_clock'][-1].item()
             duration = (end_time - start_time).total_seconds()
             
             # Generate hold intervals if requested
@@ -553,13 +740,12 @@ def extract_per_file_intervals(
                         intervals.extend(hold_intervals)
             
             # Calculate average Ewe from all measurements
-            ewe_values = [m['ewe_v'] for m in measurements if m['ewe_v'] is not None]
-            avg_ewe = sum(ewe_values) / len(ewe_values) if ewe_values else None
+            avg_ewe = average_ewe(slice(None))
             
             if verbose:
                 print(f"  Start: {start_time.isoformat()}")
                 print(f"  End: {end_time.isoformat()}")
-                print(f"  Duration: {duration:.2f}s, {len(measurements)} frequencies")
+                print(f"  Duration: {duration:.2f}s, {len(times)} frequencies")
                 if avg_ewe is not None:
                     print(f"  Avg <Ewe>: {avg_ewe:.4f} V")
             
@@ -573,9 +759,9 @@ def extract_per_file_intervals(
                 'start': start_time.isoformat(),
                 'end': end_time.isoformat(),
                 'duration_seconds': duration,
-                'n_frequencies': len(measurements),
-                'first_time_s': measurements[0]['time_seconds'],
-                'last_time_s': measurements[-1]['time_seconds'],
+                'n_frequencies': len(times),
+                'first_time_s': float(times[0]),
+                'last_time_s': float(times[-1]),
             }
             if avg_ewe is not None:
                 interval_data['avg_ewe_v'] = avg_ewe
@@ -611,14 +797,7 @@ def extract_per_frequency_intervals(
         List of interval dictionaries
     """
     data_dir = Path(data_dir)
-    all_files = glob.glob(str(data_dir / pattern))
-    
-    # Sort numerically by extracting number from C02_N pattern
-    def extract_number(filepath: str) -> int:
-        match = re.search(r'_(\d+)\.mpt$', filepath)
-        return int(match.group(1)) if match else 0
-    
-    files = sorted([f for f in all_files if exclude not in Path(f).name], key=extract_number)
+    files = _find_mpt_files(data_dir, pattern, exclude)
     
     if not files:
         raise ValueError(f"No files found matching pattern {pattern} in {data_dir}")
@@ -631,43 +810,46 @@ def extract_per_frequency_intervals(
             print(f"Processing: {filename}")
         
         try:
-            measurements = read_frequency_measurements(filepath)
+            columns = read_measurement_columns(filepath)
+            n_measurements = len(columns['time_seconds'])
             
-            if len(measurements) < 2:
+            if n_measurements < 2:
                 if verbose:
                     print(f"  Warning: Not enough measurements for intervals")
                 continue
             
             if verbose:
-                print(f"  Found {len(measurements)} frequency measurements")
+                print(f"  Found {n_measurements} frequency measurements")
             
-            # Create intervals between consecutive measurements
-            for i in range(len(measurements) - 1):
-                start = measurements[i]['wall_clock']
-                end = measurements[i + 1]['wall_clock']
-                duration = (end - start).total_seconds()
-                
-                interval_data = {
+            # Create intervals between consecutive measurements: each one
+            # starts at a measurement and ends at the next
+            wall_clock = columns['wall_clock']
+            durations = np.diff(wall_clock) / np.timedelta64(1, 'us') / 1e6
+            # Each timestamp is formatted once and shared by the interval it
+            # ends and the one it starts
+            wall_clock_iso = _isoformat(wall_clock)
+            
+            # Missing EIS values are NaN in the columns and left out below
+            eis_fields = ['ewe_v', 'z_ohm', 'im_z_ohm', 'phase_deg']
+            eis_values = [columns[field][:-1].tolist() for field in eis_fields]
+            
+            # Build the whole file's intervals in one comprehension
+            intervals.extend([
+                {
                     'filename': filename,
-                    'frequency_hz': measurements[i]['frequency_hz'],
+                    'frequency_hz': frequency,
                     'measurement_index': i,
-                    'start': start.isoformat(),
-                    'end': end.isoformat(),
-                    'duration_seconds': duration
+                    'start': start,
+                    'end': end,
+                    'duration_seconds': duration,
+                    # Add EIS data if available
+                    **{field: value for field, value in zip(eis_fields, values) if value == value},
                 }
-                
-                # Add EIS data if available
-                m = measurements[i]
-                if m['ewe_v'] is not None:
-                    interval_data['ewe_v'] = m['ewe_v']
-                if m['z_ohm'] is not None:
-                    interval_data['z_ohm'] = m['z_ohm']
-                if m['im_z_ohm'] is not None:
-                    interval_data['im_z_ohm'] = m['im_z_ohm']
-                if m['phase_deg'] is not None:
-                    interval_data['phase_deg'] = m['phase_deg']
-                
-                intervals.append(interval_data)
+                for i, (start, end, duration, frequency, *values) in enumerate(zip(
+                    wall_clock_iso[:-1], wall_clock_iso[1:], durations.tolist(),
+                    columns['frequency_hz'][:-1].tolist(), *eis_values
+                ))
+            ])
             
         except Exception as e:
             if verbose:
@@ -679,6 +861,24 @@ def extract_per_frequency_intervals(
     return intervals
 
 
+def _write_json(result: Dict, stream) -> None:
+    """Write result to a text stream as indented JSON.
+    
+    Uses orjson when it is installed, which serializes large interval lists
+    much faster; otherwise json.dump streams the document to the file.
+    Floats may be spelled differently by the two (e.g. 0.00001 vs 1e-05).
+    orjson writes non-ASCII characters as raw UTF-8 and has no equivalent
+    of json's ensure_ascii, so documents with non-ASCII paths or labels
+    go through json.dump to keep the output ASCII with \\uXXXX escapes.
+    """
+    if orjson is not None:
+        data = orjson.dumps(result, option=orjson.OPT_INDENT_2)
+        if data.isascii():
+            stream.write(data.decode('ascii'))
+            return
+    json.dump(result, stream, indent=2)
+
+
 @click.command()
 @click.option(
     '--data-dir',
@@ -816,12 +1016,13 @@ def main(data_dir: str, pattern: str, exclude: str, resolution: str,
     
     # Output
     if output:
-        with open(output, 'w') as f:
-            json.dump(result, f, indent=2)
+        with open(output, 'w', encoding='utf-8') as f:
+            _write_json(result, f)
         if not quiet:
             print(f"\nSaved {len(intervals)} intervals to: {output}")
     else:
-        print(json.dumps(result, indent=2))
+        _write_json(result, sys.stdout)
+        sys.stdout.write('\n')
     
     return 0
 
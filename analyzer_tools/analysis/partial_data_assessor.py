@@ -3,7 +3,6 @@ import glob
 import json
 import logging
 import numpy as np
-import matplotlib.pyplot as plt
 import re
 from datetime import datetime
 from analyzer_tools.config_utils import get_config
@@ -34,20 +33,22 @@ def find_overlap_regions(data_parts):
     if not data_parts or len(data_parts) < 2:
         return []
 
+    # Extract each Q column and its range once; every interior part is
+    # compared against both of its neighbours.
+    q_columns = [data[:, 0] for data in data_parts]
+    q_ranges = [(q.min(), q.max()) for q in q_columns]
+
     overlaps = []
     for i in range(len(data_parts) - 1):
-        data1 = data_parts[i]
-        data2 = data_parts[i+1]
-
-        q1_min, q1_max = data1[:, 0].min(), data1[:, 0].max()
-        q2_min, q2_max = data2[:, 0].min(), data2[:, 0].max()
+        q1, q2 = q_columns[i], q_columns[i+1]
+        (q1_min, q1_max), (q2_min, q2_max) = q_ranges[i], q_ranges[i+1]
 
         overlap_min = max(q1_min, q2_min)
         overlap_max = min(q1_max, q2_max)
 
         if overlap_min < overlap_max:
-            overlap1 = data1[(data1[:, 0] >= overlap_min) & (data1[:, 0] <= overlap_max)]
-            overlap2 = data2[(data2[:, 0] >= overlap_min) & (data2[:, 0] <= overlap_max)]
+            overlap1 = data_parts[i][(q1 >= overlap_min) & (q1 <= overlap_max)]
+            overlap2 = data_parts[i+1][(q2 >= overlap_min) & (q2 <= overlap_max)]
             overlaps.append((overlap1, overlap2))
             
     return overlaps
@@ -74,6 +75,8 @@ def plot_overlap_regions(data_parts, set_id, output_dir):
     """
     Plot the overlap regions for a given data set.
     """
+    import matplotlib.pyplot as plt
+
     fig, ax = plt.subplots(dpi=150, figsize=(6, 4))
     plt.subplots_adjust(left=0.15, right=0.95, top=0.95, bottom=0.15)
     for i, data in enumerate(data_parts):
@@ -26,9 +26,25 @@ if project_root not in sys.path:
 
 try:
     from ..utils import summary_plots
+    from ..utils.json_utils import read_json
 except ImportError:
     # Fallback for standalone execution
     from analyzer_tools.utils import summary_plots
+    from analyzer_tools.utils.json_utils import read_json
+
+_PROFILE_INDEX_RE = re.compile(r"problem-(\d+)-profile\.dat$")
+
+# Headings of the report sections this module writes and later replaces
+_FIT_RESULTS_HEADER = "## Fit results"
+_AURE_HEADER = "## LLM Evaluation (AuRE)"
+
+# Report sections run until the next level-2 heading or the end of the file
+_FIT_RESULTS_SECTION_RE = re.compile(
+    rf"({re.escape(_FIT_RESULTS_HEADER)}.*?)(?=\n## |\Z)", re.DOTALL
+)
+_AURE_SECTION_RE = re.compile(
+    rf"({re.escape(_AURE_HEADER)}.*?)(?=\n## |\Z)", re.DOTALL
+)
 
 
 def load_expt_json(expt_json_file):
@@ -46,10 +62,8 @@ def load_expt_json(expt_json_file):
     if not os.path.exists(expt_json_file):
         raise FileNotFoundError(f"Experiment JSON file not found: {expt_json_file}")
 
-    with open(expt_json_file, "r") as input_file:
-        serialized = input_file.read()
-        serialized_dict = json.loads(serialized)
-        expt = serialize.deserialize(serialized_dict, migration=True)
+    serialized_dict = read_json(expt_json_file)
+    expt = serialize.deserialize(serialized_dict, migration=True)
     return expt
 
 
@@ -141,11 +155,10 @@ def assess_result(directory, reports_dir):
     param_uncertainties = {}
     if os.path.exists(err_json_file):
         try:
-            with open(err_json_file, "r") as f:
-                err_data = json.load(f)
-                for param_name, param_info in err_data.items():
-                    if isinstance(param_info, dict) and "std" in param_info:
-                        param_uncertainties[param_name] = param_info["std"]
+            err_data = read_json(err_json_file)
+            for param_name, param_info in err_data.items():
+                if isinstance(param_info, dict) and "std" in param_info:
+                    param_uncertainties[param_name] = param_info["std"]
         except (json.JSONDecodeError, KeyError):
             print(f"Warning: Could not parse {err_json_file} for uncertainties")
 
@@ -153,15 +166,14 @@ def assess_result(directory, reports_dir):
     param_ranges = {}
     if os.path.exists(expt_json_file):
         try:
-            with open(expt_json_file, "r") as f:
-                expt_data = json.load(f)
-                references = expt_data.get("references", {})
-                for ref_id, ref_data in references.items():
-                    if "bounds" in ref_data and ref_data["bounds"] is not None:
-                        param_name = ref_data.get("name", "")
-                        bounds = ref_data["bounds"]
-                        if len(bounds) >= 2:
-                            param_ranges[param_name] = (bounds[0], bounds[1])
+            expt_data = read_json(expt_json_file)
+            references = expt_data.get("references", {})
+            for ref_id, ref_data in references.items():
+                if "bounds" in ref_data and ref_data["bounds"] is not None:
+                    param_name = ref_data.get("name", "")
+                    bounds = ref_data["bounds"]
+                    if len(bounds) >= 2:
+                        param_ranges[param_name] = (bounds[0], bounds[1])
         except (json.JSONDecodeError, KeyError):
             print(f"Warning: Could not parse {expt_json_file} for parameter ranges")
 
@@ -230,7 +242,7 @@ def assess_result(directory, reports_dir):
         if fp in seen_fingerprints:
             continue
         seen_fingerprints.add(fp)
-        m = re.search(r"problem-(\d+)-profile\.dat$", pfile)
+        m = _PROFILE_INDEX_RE.search(pfile)
         idx = int(m.group(1)) if m else len(unique_profiles) + 1
         unique_profiles.append((idx, pfile))
 
@@ -282,10 +294,12 @@ def assess_result(directory, reports_dir):
                 alpha=0.2,
                 color=color,
             )
-            for zi, bi, lo, hi in zip(
-                shifted_z[:start_idx], best[:start_idx], low[:start_idx], high[:start_idx]
-            ):
-                sld_txt_handle.write(f"{state_num} {zi:.6f} {bi:.6f} {lo:.6f} {hi:.6f}\n")
+            sld_txt_handle.write("".join(
+                f"{state_num} {zi:.6f} {bi:.6f} {lo:.6f} {hi:.6f}\n"
+                for zi, bi, lo, hi in zip(
+                    shifted_z[:start_idx], best[:start_idx], low[:start_idx], high[:start_idx]
+                )
+            ))
         except Exception as exc:
             print(f"Could not plot SLD uncertainty band for state {state_num}: {exc}")
 
@@ -305,7 +319,6 @@ def assess_result(directory, reports_dir):
     # Update the report
     report_file = os.path.join(reports_dir, f"report_{tag}.md")
 
-    new_section_header = "## Fit results"
     now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
     # Format fit quality information
@@ -325,12 +338,10 @@ def assess_result(directory, reports_dir):
         fit_quality_text = f"**Chi-squared**: {chisq:.2g}"
 
     # Create detailed parameter table
-    param_table = (
-        "| Layer | Parameter | Fitted Value | Uncertainty | Min | Max | Units |\n"
-    )
-    param_table += (
-        "|-------|-----------|--------------|-------------|-----|-----|-------|\n"
-    )
+    param_rows = [
+        "| Layer | Parameter | Fitted Value | Uncertainty | Min | Max | Units |\n",
+        "|-------|-----------|--------------|-------------|-----|-----|-------|\n",
+    ]
 
     # Group parameters by layer/component
     layers = {}
@@ -407,10 +418,13 @@ def assess_result(directory, reports_dir):
                 min_str = "Fixed"
                 max_str = "Fixed"
 
-            param_table += f"| **{layer_name}** | {param_type} | {value_str} | {unc_str} | {min_str} | {max_str} | {units} |\n"
+            param_rows.append(
+                f"| **{layer_name}** | {param_type} | {value_str} | {unc_str} | {min_str} | {max_str} | {units} |\n"
+            )
+    param_table = "".join(param_rows)
 
     new_content = (
-        f"{new_section_header}\n"
+        f"{_FIT_RESULTS_HEADER}\n"
         f"**Assessment run on**: {now}\n\n"
         f"### ✅ Fit Quality\n"
         f"{fit_quality_text}\n\n"
@@ -433,11 +447,8 @@ def assess_result(directory, reports_dir):
             content = f.read()
 
         # Use regex to find and replace the section for the same model
-        pattern = re.compile(
-            rf"({re.escape(new_section_header)}.*?)(?=\n## |\Z)", re.DOTALL
-        )
-        if pattern.search(content):
-            content = pattern.sub(new_content, content)
+        if _FIT_RESULTS_SECTION_RE.search(content):
+            content = _FIT_RESULTS_SECTION_RE.sub(new_content, content)
         else:
             content += "\n" + new_content
 
@@ -507,7 +518,7 @@ def run_aure_evaluate(
 
 def _render_aure_section(evaluation: Dict[str, Any]) -> str:
     """Render an AuRE evaluation dict as a markdown section."""
-    lines: List[str] = ["## LLM Evaluation (AuRE)", ""]
+    lines: List[str] = [_AURE_HEADER, ""]
     if evaluation.get("error"):
         lines.append(f"> AuRE evaluate did not run successfully: `{evaluation['error']}`")
         if evaluation.get("stderr"):
@@ -560,15 +571,11 @@ def _render_aure_section(evaluation: Dict[str, Any]) -> str:
 def append_aure_section_to_report(report_path: str, evaluation: Dict[str, Any]) -> None:
     """Append or replace an AuRE Evaluation section in *report_path*."""
     section = _render_aure_section(evaluation)
-    header = "## LLM Evaluation (AuRE)"
     if os.path.exists(report_path):
         with open(report_path, "r", encoding="utf-8") as f:
             content = f.read()
-        pattern = re.compile(
-            rf"({re.escape(header)}.*?)(?=\n## |\Z)", re.DOTALL
-        )
-        if pattern.search(content):
-            content = pattern.sub(section.rstrip() + "\n", content)
+        if _AURE_SECTION_RE.search(content):
+            content = _AURE_SECTION_RE.sub(section.rstrip() + "\n", content)
         else:
             content = content.rstrip() + "\n\n" + section
         with open(report_path, "w", encoding="utf-8") as f:
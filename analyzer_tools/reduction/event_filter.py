@@ -7,21 +7,32 @@ and splits an event workspace by those intervals.
 
 from __future__ import annotations
 
+import functools
 import logging
+import re
 from datetime import datetime
 from typing import Any
 
 logger = logging.getLogger(__name__)
 
+_ISO_DATETIME_RE = re.compile(
+    r"\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}(?:\.\d{1,6})?\Z",
+    re.ASCII,
+)
+
 
 # ---------------------------------------------------------------------------
 # Interval parsing
 # ---------------------------------------------------------------------------
 
+@functools.lru_cache(maxsize=4096)
 def parse_iso_datetime(iso_string: str) -> datetime:
     """Parse an ISO-8601 datetime string.
 
-    Supports formats with and without fractional seconds.
+    Supports formats with and without fractional seconds.  The fixed-width
+    form written by the EIS extractor is handed to ``datetime.fromisoformat``;
+    anything else goes through ``strptime``.  Adjacent intervals share
+    boundaries, so results are cached.
 
     Parameters
     ----------
@@ -37,6 +48,13 @@ def parse_iso_datetime(iso_string: str) -> datetime:
     ValueError
         If the string does not match any known format.
     """
+    # fromisoformat also accepts dates, spaces and UTC offsets, so only
+    # trust it for the fixed-width form strptime would accept.
+    if _ISO_DATETIME_RE.match(iso_string):
+        try:
+            return datetime.fromisoformat(iso_string)
+        except ValueError:
+            pass
     for fmt in ("%Y-%m-%dT%H:%M:%S.%f", "%Y-%m-%dT%H:%M:%S"):
         try:
             return datetime.strptime(iso_string, fmt)
@@ -15,18 +15,48 @@ The tool extracts:
 All data is packaged into a Parquet file with proper schema for Iceberg.
 """
 
+import functools
 import json
 import os
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple
 
 import click
 import numpy as np
-import pandas as pd
 import pyarrow as pa
 import pyarrow.parquet as pq
 
+from .json_utils import read_json
+
+# Number of reflectivity files loaded and written per Parquet row group
+FILES_PER_ROW_GROUP = 256
+
+# Column types of the reflectivity table. Declaring them keeps the schema
+# stable across runs, e.g. hold_index stays int64 whether or not some files
+# have no matching hold interval.
+REFLECTIVITY_SCHEMA = pa.schema([
+    ('run_number', pa.int64()),
+    ('filename', pa.string()),
+    ('filepath', pa.string()),
+    ('n_points', pa.int64()),
+    ('Q', pa.list_(pa.float32())),
+    ('R', pa.list_(pa.float32())),
+    ('dR', pa.list_(pa.float32())),
+    ('dQ', pa.list_(pa.float32())),
+    ('Q_min', pa.float64()),
+    ('Q_max', pa.float64()),
+    ('R_min', pa.float64()),
+    ('R_max', pa.float64()),
+    ('interval_label', pa.string()),
+    ('interval_type', pa.string()),
+    ('interval_start', pa.string()),
+    ('interval_end', pa.string()),
+    ('duration_seconds', pa.float64()),
+    ('hold_index', pa.int64()),
+])
+
 
 def load_split_file(split_file: str) -> Dict[str, Any]:
     """
@@ -38,8 +68,7 @@ def load_split_file(split_file: str) -> Dict[str, Any]:
     Returns:
         Dictionary containing split metadata
     """
-    with open(split_file, 'r') as f:
-        data = json.load(f)
+    data = read_json(split_file)
     
     return {
         'source_directory': data.get('source_directory', ''),
@@ -60,8 +89,7 @@ def load_reduction_metadata(reduction_json: str) -> Dict[str, Any]:
     Returns:
         Dictionary containing reduction metadata
     """
-    with open(reduction_json, 'r') as f:
-        data = json.load(f)
+    data = read_json(reduction_json)
     
     return {
         'run_number': data.get('run_number'),
@@ -81,9 +109,18 @@ def load_reduction_template(template_file: str) -> str:
         
     Returns:
         Raw XML content as string
+    
+    The content is cached until the file's modification time or size
+    changes, so batch jobs sharing one template only read it once.
     """
-    with open(template_file, 'r') as f:
-        return f.read()
+    stat = os.stat(template_file)
+    return _read_template_cached(os.path.abspath(template_file), stat.st_mtime_ns, stat.st_size)
+
+
+@functools.lru_cache(maxsize=8)
+def _read_template_cached(template_file: str, mtime_ns: int, size: int) -> str:
+    """Read a template file; mtime_ns and size only serve as the cache key."""
+    return Path(template_file).read_text()
 
 
 def load_reflectivity_file(filepath: str) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
@@ -96,14 +133,19 @@ def load_reflectivity_file(filepath: str) -> Tuple[np.ndarray, np.ndarray, np.nd
     Returns:
         Tuple of (Q, R, dR, dQ) arrays
     """
-    data = np.loadtxt(filepath)
-    if data.ndim == 1:
-        # Single row case
-        data = data.reshape(1, -1)
-    
+    # ndmin=2 keeps single-row files two-dimensional
+    data = np.loadtxt(filepath, ndmin=2)
     return data[:, 0], data[:, 1], data[:, 2], data[:, 3]
 
 
+def _load_reflectivity_or_error(filepath: str):
+    """Return load_reflectivity_file(filepath), or the exception it raised."""
+    try:
+        return load_reflectivity_file(filepath)
+    except Exception as e:
+        return e
+
+
 def find_reflectivity_files(reduced_dir: str) -> List[str]:
     """
     Find all reflectivity .txt files in the reduced directory.
@@ -114,9 +156,14 @@ def find_reflectivity_files(reduced_dir: str) -> List[str]:
     Returns:
         List of paths to reflectivity files (sorted)
     """
-    reduced_path = Path(reduced_dir)
-    txt_files = sorted([str(f) for f in reduced_path.glob('*.txt')])
-    return txt_files
+    try:
+        with os.scandir(Path(reduced_dir)) as entries:
+            return sorted(
+                entry.path for entry in entries
+                if entry.name.endswith('.txt') and entry.is_file()
+            )
+    except OSError:
+        return []
 
 
 def find_reduction_json(reduced_dir: str) -> Optional[str]:
@@ -129,10 +176,13 @@ def find_reduction_json(reduced_dir: str) -> Optional[str]:
     Returns:
         Path to the reduction JSON file, or None if not found
     """
-    reduced_path = Path(reduced_dir)
-    json_files = list(reduced_path.glob('*_eis_reduction.json'))
-    if json_files:
-        return str(json_files[0])
+    try:
+        with os.scandir(Path(reduced_dir)) as entries:
+            for entry in entries:
+                if entry.name.endswith('_eis_reduction.json'):
+                    return entry.path
+    except OSError:
+        pass
     return None
 
 
@@ -147,29 +197,37 @@ def extract_interval_for_file(filename: str, intervals: List[Dict]) -> Optional[
     Returns:
         Matching interval dictionary, or None if not found
     """
+    return _index_intervals_by_label(intervals).get(_label_from_filename(filename))
+
+
+def _label_from_filename(filename: str) -> str:
+    """Extract the interval label from a reduced file name."""
     # Extract the label part from filename: r218389_hold_gap_1_0.txt -> hold_gap_1_0
     base = os.path.basename(filename)
     # Remove run number prefix (r######_) and extension
     parts = base.replace('.txt', '').split('_', 1)
     if len(parts) > 1:
-        label = parts[1]
-    else:
-        label = base.replace('.txt', '')
-    
+        return parts[1]
+    return base.replace('.txt', '')
+
+
+def _index_intervals_by_label(intervals: List[Dict]) -> Dict[str, Dict]:
+    """Map each label to its interval; the first interval wins on duplicates."""
+    by_label = {}
     for interval in intervals:
-        if interval.get('label') == label:
-            return interval
-    
-    return None
+        label = interval.get('label')
+        if label is not None:
+            by_label.setdefault(label, interval)
+    return by_label
 
 
 def create_reflectivity_records(
     reflectivity_files: List[str],
     intervals: List[Dict],
     run_number: int
-) -> List[Dict[str, Any]]:
+) -> Dict[str, List[Any]]:
     """
-    Create records for each reflectivity file with associated metadata.
+    Create columns of per-file records with associated metadata.
     
     Args:
         reflectivity_files: List of paths to reflectivity files
@@ -177,57 +235,54 @@ def create_reflectivity_records(
         run_number: Run number for this dataset
         
     Returns:
-        List of record dictionaries ready for DataFrame conversion
+        Dictionary mapping each REFLECTIVITY_SCHEMA column name to a list with
+        one entry per loaded file. Q, R, dR and dQ hold float32 numpy arrays,
+        which Arrow converts without going through Python lists; reduced
+        reflectivity does not carry more than ~6 significant figures. The
+        Q/R extrema are taken from the float64 data so they keep the exact
+        values of the file.
     """
-    records = []
+    columns = {name: [] for name in REFLECTIVITY_SCHEMA.names}
+    intervals_by_label = _index_intervals_by_label(intervals)
+    
+    # Load the files concurrently to overlap I/O waits.
+    # Results come back in input order.
+    all_data = []
+    if reflectivity_files:
+        with ThreadPoolExecutor(max_workers=min(8, len(reflectivity_files))) as pool:
+            all_data = list(pool.map(_load_reflectivity_or_error, reflectivity_files))
     
-    for filepath in reflectivity_files:
+    for filepath, data in zip(reflectivity_files, all_data):
         filename = os.path.basename(filepath)
         
-        # Load reflectivity data
-        try:
-            Q, R, dR, dQ = load_reflectivity_file(filepath)
-        except Exception as e:
-            click.echo(f"Warning: Failed to load {filepath}: {e}", err=True)
+        if isinstance(data, Exception):
+            click.echo(f"Warning: Failed to load {filepath}: {data}", err=True)
             continue
+        Q, R, dR, dQ = data
         
-        # Match to interval metadata
-        interval = extract_interval_for_file(filename, intervals)
+        columns['run_number'].append(run_number)
+        columns['filename'].append(filename)
+        columns['filepath'].append(filepath)
+        columns['n_points'].append(len(Q))
+        columns['Q'].append(Q.astype(np.float32))
+        columns['R'].append(R.astype(np.float32))
+        columns['dR'].append(dR.astype(np.float32))
+        columns['dQ'].append(dQ.astype(np.float32))
+        columns['Q_min'].append(float(Q.min()))
+        columns['Q_max'].append(float(Q.max()))
+        columns['R_min'].append(float(R.min()))
+        columns['R_max'].append(float(R.max()))
         
-        record = {
-            'run_number': run_number,
-            'filename': filename,
-            'filepath': filepath,
-            'n_points': len(Q),
-            'Q': Q.tolist(),
-            'R': R.tolist(),
-            'dR': dR.tolist(),
-            'dQ': dQ.tolist(),
-            'Q_min': float(Q.min()),
-            'Q_max': float(Q.max()),
-            'R_min': float(R.min()),
-            'R_max': float(R.max()),
-        }
-        
-        # Add interval metadata if found
-        if interval:
-            record['interval_label'] = interval.get('label', '')
-            record['interval_type'] = interval.get('interval_type', '')
-            record['interval_start'] = interval.get('start', '')
-            record['interval_end'] = interval.get('end', '')
-            record['duration_seconds'] = interval.get('duration_seconds')
-            record['hold_index'] = interval.get('hold_index')
-        else:
-            record['interval_label'] = ''
-            record['interval_type'] = ''
-            record['interval_start'] = ''
-            record['interval_end'] = ''
-            record['duration_seconds'] = None
-            record['hold_index'] = None
-        
-        records.append(record)
-    
-    return records
+        # Add interval metadata if found (empty/None otherwise)
+        interval = intervals_by_label.get(_label_from_filename(filename)) or {}
+        columns['interval_label'].append(interval.get('label', ''))
+        columns['interval_type'].append(interval.get('interval_type', ''))
+        columns['interval_start'].append(interval.get('start', ''))
+        columns['interval_end'].append(interval.get('end', ''))
+        columns['duration_seconds'].append(interval.get('duration_seconds'))
+        columns['hold_index'].append(interval.get('hold_index'))
+    
+    return columns
 
 
 def package_to_parquet(
@@ -274,17 +329,30 @@ def package_to_parquet(
     if not intervals:
         intervals = split_metadata.get('intervals', [])
     
-    # Create records for each reflectivity file
-    records = create_reflectivity_records(
-        reflectivity_files,
-        intervals,
-        reduction_metadata.get('run_number', 0)
-    )
-    
-    click.echo(f"Created {len(records)} records")
+    # Create output directory if needed
+    output_path = Path(output_file)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
     
-    # Create DataFrame for reflectivity data
-    df = pd.DataFrame(records)
+    # Write reflectivity data to the main parquet file. Files are loaded and
+    # written in batches of one row group each, so only one batch of arrays
+    # is held in memory at a time.
+    data_output = str(output_path)
+    run_number = reduction_metadata.get('run_number', 0)
+    n_records = 0
+    with pq.ParquetWriter(data_output, REFLECTIVITY_SCHEMA,
+                          compression='zstd', use_dictionary=True) as writer:
+        for start in range(0, len(reflectivity_files), FILES_PER_ROW_GROUP):
+            records = create_reflectivity_records(
+                reflectivity_files[start:start + FILES_PER_ROW_GROUP],
+                intervals,
+                run_number
+            )
+            if records['filename']:
+                writer.write_table(pa.Table.from_pydict(records, schema=REFLECTIVITY_SCHEMA))
+                n_records += len(records['filename'])
+    
+    click.echo(f"Created {n_records} records")
+    click.echo(f"Wrote reflectivity data to: {data_output}")
     
     # Create metadata table (single row with experiment-level info)
     metadata_record = {
@@ -305,23 +373,11 @@ def package_to_parquet(
     metadata_record['split_metadata_json'] = json.dumps(split_metadata)
     metadata_record['reduction_metadata_json'] = json.dumps(reduction_metadata)
     
-    metadata_df = pd.DataFrame([metadata_record])
-    
-    # Create output directory if needed
-    output_path = Path(output_file)
-    output_path.parent.mkdir(parents=True, exist_ok=True)
-    
-    # Write to Parquet with separate row groups for data and metadata
-    # We'll create a combined output with two types of records
-    
-    # Option 1: Write reflectivity data to main parquet file
-    data_output = str(output_path)
-    df.to_parquet(data_output, engine='pyarrow', index=False)
-    click.echo(f"Wrote reflectivity data to: {data_output}")
+    metadata_table = pa.Table.from_pylist([metadata_record])
     
-    # Option 2: Write metadata to a separate file
+    # Write metadata to a separate file
     metadata_output = str(output_path).replace('.parquet', '_metadata.parquet')
-    metadata_df.to_parquet(metadata_output, engine='pyarrow', index=False)
+    pq.write_table(metadata_table, metadata_output, compression='zstd', use_dictionary=True)
     click.echo(f"Wrote experiment metadata to: {metadata_output}")
     
     return data_output
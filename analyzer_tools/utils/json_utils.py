@@ -0,0 +1,32 @@
+"""
+JSON helpers shared by the analysis tools.
+
+orjson is used when it is installed (the ``speedups`` extra)
+and the stdlib json module otherwise.
+"""
+
+import json
+from pathlib import Path
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+
+def read_json(path: str) -> Any:
+    """
+    Read a JSON file, using orjson when it is installed.
+
+    orjson rejects the NaN/Infinity literals that the stdlib json module
+    accepts (and that bumps writes for undefined uncertainties), so such
+    files fall back to json.loads.
+    """
+    raw = Path(path).read_bytes()
+    if orjson is not None:
+        try:
+            return orjson.loads(raw)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(raw)
@@ -1,6 +1,8 @@
 import sys
 import os
 import json
+import functools
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
 from matplotlib import pyplot as plt
 import matplotlib.lines as mlines
@@ -29,6 +31,22 @@ def load_problem(json_file: str) -> FitProblem:
     return load_file(json_file)
 
 
+@functools.lru_cache(maxsize=32)
+def _sld_contour(expt_file, model_path, expt_stat, chain_stat):
+    """Compute the SLD band of a fit; the (mtime_ns, size) stats of the
+    expt file and MC chain only serve as the cache key, so replotting a
+    fit reuses its contour until either file changes."""
+    # Load the model that was used for fitting
+    expt = model_utils.expt_from_json_file(expt_file, set_ranges=True)
+    problem = FitProblem(expt)
+    state = dream.state.load_state(model_path)
+
+    contour = model_utils.get_sld_contour(problem, state, cl=90, align=-1)[0]
+    # The array is shared between calls
+    contour.flags.writeable = False
+    return contour
+
+
 def plot_sld(profile_file, label, show_cl=True, z_offset=0.0):
     """
     :param profile_file: File containing the SLD profile.
@@ -66,20 +84,20 @@ def plot_sld(profile_file, label, show_cl=True, z_offset=0.0):
             _plot_sld()
             return
 
-        # Load the model that was used for fitting
-        expt = model_utils.expt_from_json_file(expt_file, set_ranges=True)
-        problem = FitProblem(expt)
         model_path = profile_file.replace("-profile.dat", "")
-        state = dream.state.load_state(model_path)
-
-        z, best, low, high = model_utils.get_sld_contour(
-            problem, state, cl=90, align=-1
-        )[0]
+        expt_stat = os.stat(expt_file)
+        chain_stat = os.stat(mc_file)
+        z, best, low, high = _sld_contour(
+            os.path.abspath(expt_file),
+            os.path.abspath(model_path),
+            (expt_stat.st_mtime_ns, expt_stat.st_size),
+            (chain_stat.st_mtime_ns, chain_stat.st_size),
+        )
 
-        # Find the starting point of the distribution
-        for i in range(len(best) - 1, 0, -1):
-            if np.fabs(best[i] - best[i - 1]) > 0.001:
-                break
+        # Find the starting point of the distribution: the last step
+        # larger than 0.001, or the first point if there is none
+        steps = np.abs(np.diff(best)) > 0.001
+        i = len(best) - 1 - int(np.argmax(steps[::-1])) if steps.any() else 1
 
         _z = z[i] - z + z_offset
         plt.plot(
@@ -97,6 +115,36 @@ def plot_sld(profile_file, label, show_cl=True, z_offset=0.0):
 
 
 
+def _get_run_files(dynamic_run, dyn_data_dir):
+    """
+    Return the sorted names of the data files for *dynamic_run*.
+
+    Only entries starting with ``r<run>_t`` are kept before sorting, so
+    the rest of the directory (e.g. other runs) is never sorted.
+    """
+    prefix = "r%d_t" % dynamic_run
+    with os.scandir(dyn_data_dir) as entries:
+        return sorted(
+            entry.name
+            for entry in entries
+            if entry.name.startswith(prefix) and entry.is_file()
+        )
+
+
+def _load_run_data(dyn_data_dir, file_names):
+    """
+    Load *file_names* from *dyn_data_dir*, returning the transposed arrays in order.
+
+    Files are read by a small thread pool to overlap I/O waits. All files
+    are loaded before any is returned, so a bad file raises up front.
+    """
+    paths = [os.path.join(dyn_data_dir, name) for name in file_names]
+    if not paths:
+        return []
+    with ThreadPoolExecutor(max_workers=min(8, len(paths))) as pool:
+        return [data.T for data in pool.map(np.loadtxt, paths)]
+
+
 def plot_dyn_data(
     dynamic_run,
     initial_state,
@@ -108,6 +156,7 @@ def plot_dyn_data(
     model_name="__model",
     scale=1,
     model_id=1,
+    show=True,
 ):
     """
     Plot the dynamic data for a given run, and display the initial and final states.
@@ -122,7 +171,8 @@ def plot_dyn_data(
         post_fit = np.loadtxt(final_state).T
 
     # Dynamic data
-    _file_list = sorted(os.listdir(dyn_data_dir))
+    prefix = "r%d_t" % dynamic_run
+    _good_files = _get_run_files(dynamic_run, dyn_data_dir)
     fig, ax = plt.subplots(dpi=150, figsize=(5, 8))
     plt.subplots_adjust(left=0.15, right=0.95, top=0.98, bottom=0.1)
 
@@ -149,65 +199,65 @@ def plot_dyn_data(
             zorder=400,
         )
 
-    # Get only the files for the run we're interested in
-    _good_files = [_f for _f in _file_list if _f.startswith("r%d_t" % dynamic_run)]
-
     print(len(_good_files))
 
     scale = 1.0
     multiplier = 10
     file_list = []
 
-    # Check timing
-    first_time = int(
-        os.path.splitext(_good_files[first_index])[0].replace("r%d_t" % dynamic_run, "")
-    )
-    second_time = int(
-        os.path.splitext(_good_files[first_index + 1])[0].replace(
-            "r%d_t" % dynamic_run, ""
+    def _slice_time(data_name):
+        return int(data_name.removeprefix(prefix))
+
+    # Only the plotted slices are parsed; other files of the run may not
+    # follow the r<run>_t<time> naming
+    plotted_files = _good_files[first_index:last_index]
+    data_names = [os.path.splitext(_file)[0] for _file in plotted_files]
+    times = [_slice_time(name) for name in data_names]
+
+    # Check timing. A single slice has no following one to take the time
+    # step from.
+    delta_t = 0
+    if first_index + 1 < len(_good_files):
+        first_time = _slice_time(os.path.splitext(_good_files[first_index])[0])
+        second_time = _slice_time(os.path.splitext(_good_files[first_index + 1])[0])
+        delta_t = second_time - first_time
+
+    for _file, _data_name, _time in zip(plotted_files, data_names, times):
+        scale *= 1
+        _data = np.loadtxt(os.path.join(dyn_data_dir, _file)).T
+        _label = "%d < t < %d s" % (_time, _time + delta_t)
+
+        # Get fit if it exists
+        fit_file = os.path.join(
+            dyn_fit_dir, _data_name, f"{model_name}-{model_id}-refl.dat"
         )
-    )
-    delta_t = second_time - first_time
-
-    for _file in _good_files[first_index:last_index]:
-        if _file.startswith("r%d_t" % dynamic_run):
-            scale *= 1
-            _data = np.loadtxt(os.path.join(dyn_data_dir, _file)).T
-            _data_name, _ = os.path.splitext(_file)
-            _time = int(_data_name.replace("r%d_t" % dynamic_run, ""))
-            _label = "%d < t < %d s" % (_time, _time + delta_t)
-
-            # Get fit if it exists
-            fit_file = os.path.join(
-                dyn_fit_dir, _data_name, f"{model_name}-{model_id}-refl.dat"
-            )
 
-            if os.path.isfile(fit_file):
-                fit_data = np.loadtxt(fit_file).T
-                plt.plot(
-                    fit_data[0],
-                    fit_data[4] * scale,
-                    markersize=2,
-                    marker="",
-                    linewidth=1,
-                    color="black",
-                )
+        if os.path.isfile(fit_file):
+            fit_data = np.loadtxt(fit_file).T
+            plt.plot(
+                fit_data[0],
+                fit_data[4] * scale,
+                markersize=2,
+                marker="",
+                linewidth=1,
+                color="black",
+            )
 
-            if len(_data) > 1:
-                idx = _data[2] < _data[1]
-                plt.errorbar(
-                    _data[0][idx],
-                    _data[1][idx] * scale,
-                    yerr=_data[2][idx] * scale,
-                    linewidth=1,
-                    markersize=2,
-                    marker=".",
-                    linestyle="",
-                    label=_label,
-                )
+        if len(_data) > 1:
+            idx = _data[2] < _data[1]
+            plt.errorbar(
+                _data[0][idx],
+                _data[1][idx] * scale,
+                yerr=_data[2][idx] * scale,
+                linewidth=1,
+                markersize=2,
+                marker=".",
+                linestyle="",
+                label=_label,
+            )
 
-                scale *= multiplier
-                file_list.append([_time, _data_name, _data_name])
+            scale *= multiplier
+            file_list.append([_time, _data_name, _data_name])
 
     final_scale = scale / multiplier
     if post_fit is not None:
@@ -235,7 +285,8 @@ def plot_dyn_data(
     plt.xscale("log")
     ax.yaxis.labelpad = 1
 
-    plt.show()
+    if show:
+        plt.show()
     return file_list
 
 
@@ -253,6 +304,7 @@ def plot_dyn_sld(
     initial_z_offset=0,
     final_z_offset=0,
     model_id=1,
+    show=True,
 ):
     fig, ax = plt.subplots(dpi=200, figsize=(5, 4.1))
     plt.subplots_adjust(left=0.15, right=0.95, top=0.95, bottom=0.15)
@@ -294,7 +346,23 @@ def plot_dyn_sld(
         plt.ylim(sld_range[0], sld_range[1])
     plt.xlabel(r"z ($\AA$)", fontsize=14)
     plt.ylabel(r"SLD ($10^{-6}/\AA^2$)", fontsize=14)
-    plt.show()
+    if show:
+        plt.show()
+
+
+def _layer_parameter_values(expt):
+    """
+    Map each layer parameter name of *expt* to its values.
+
+    Layers are visited in order and rho, irho, thickness and interface are
+    collected for each, so a name shared by several layers lists all of
+    its values in that order.
+    """
+    values = {}
+    for layer in expt.sample.layers:
+        for p in [layer.material.rho, layer.material.irho, layer.thickness, layer.interface]:
+            values.setdefault(p.name, []).append(p.value)
+    return values
 
 
 def trend_data(
@@ -362,32 +430,20 @@ def trend_data(
     t_offset = (timestamp[-1] - timestamp[0]) / len(timestamp) * 5
     if os.path.isfile(initial_state):
         expt = model_utils.expt_from_json_file(initial_state, keep_original_ranges=True)
+        layer_values = _layer_parameter_values(expt)
         for par in trend_data.keys():
-            for layer in expt.sample.layers:
-                rho = layer.material.rho
-                irho = layer.material.irho
-                thickness = layer.thickness
-                interface = layer.interface
-                for p in [rho, irho, thickness, interface]:
-                    if p.name == par:
-                        print("Initial state: %s = %g" % (par, p.value))
-                        steady_values[par].append(p.value)
-                        
-                        steady_times[par].append(timestamp[0] - t_offset)
-                        
+            for value in layer_values.get(par, []):
+                print("Initial state: %s = %g" % (par, value))
+                steady_values[par].append(value)
+                steady_times[par].append(timestamp[0] - t_offset)
 
     if os.path.isfile(final_state):
         expt = model_utils.expt_from_json_file(final_state, keep_original_ranges=True)
+        layer_values = _layer_parameter_values(expt)
         for par in trend_data.keys():
-            for layer in expt.sample.layers:
-                rho = layer.material.rho
-                irho = layer.material.irho
-                thickness = layer.thickness
-                interface = layer.interface
-                for p in [rho, irho, thickness, interface]:
-                    if p.name == par:
-                        steady_values[par].append(p.value)
-                        steady_times[par].append(timestamp[-1] + t_offset)
+            for value in layer_values.get(par, []):
+                steady_values[par].append(value)
+                steady_times[par].append(timestamp[-1] + t_offset)
 
     # Plot trend data
     n_tot = len(trend_data.keys()) + add_plot
@@ -458,24 +514,40 @@ def write_md_table(trend_data_file):
             headers = data[1].keys()
             header = "| Time | " + "|".join(headers) + "| chi2 |\n"
             header += "| " + "|".join((len(headers) + 2) * ["---"]) + "|\n"
-            output.write(header)
+            rows = [header]
 
             for i in range(len(data[0])):
-                entry = "| %g " % (data[0][i])
-                for k in data[1].keys():
-                    entry += "| %4.2f ± %4.2f " % (data[1][k][i], data[2][k][i])
-                entry += "| %g |\n" % data[3][i]
-                output.write(entry)
+                cells = "".join(
+                    "| %4.2f ± %4.2f " % (data[1][k][i], data[2][k][i]) for k in headers
+                )
+                rows.append("| %g %s| %g |\n" % (data[0][i], cells, data[3][i]))
+            output.write("".join(rows))
+
+
+def _match_q(previous_q, q):
+    """
+    Pair each value of *q* with its first exact match in *previous_q*.
+
+    Returns the indices into *q* that have a match, in order, and the
+    index of the first matching entry of *previous_q* for each of them.
+    """
+    # A stable sort keeps equal values in their original order, so the
+    # left-most search position is the first occurrence in previous_q.
+    order = np.argsort(previous_q, kind="stable")
+    sorted_q = previous_q[order]
+    pos = np.searchsorted(sorted_q, q, side="left")
+    found = pos < len(sorted_q)
+    found[found] = sorted_q[pos[found]] == q[found]
+    return np.flatnonzero(found), order[pos[found]]
 
 
 def detect_changes(dynamic_run, dyn_data_dir, first=0, last=-1, out_array=None):
     compiled_array = []
     compiled_times = []
 
-    _file_list = sorted(os.listdir(dyn_data_dir))
-
     # Get only the files for the run we're interested in
-    _good_files = [_f for _f in _file_list if _f.startswith("r%d_t" % dynamic_run)]
+    prefix = "r%d_t" % dynamic_run
+    _good_files = _get_run_files(dynamic_run, dyn_data_dir)
 
     print(len(_good_files))
     chi2 = []
@@ -487,69 +559,55 @@ def detect_changes(dynamic_run, dyn_data_dir, first=0, last=-1, out_array=None):
     previous_err = None
 
     min_q = 0.0154
-    for _file in _good_files[first:last]:
-        if _file.startswith("r%d_t" % dynamic_run):
-            _data = np.loadtxt(os.path.join(dyn_data_dir, _file)).T
-            if len(_data) == 0:
-                continue
-            idx = _data[0] >= min_q
-            _data_name, _ = os.path.splitext(_file)
-            _time = int(_data_name.replace("r%d_t" % dynamic_run, ""))
-            compiled_array.append([_data[0][idx], _data[1][idx], _data[2][idx]])
-            compiled_times.append(_time)
-
-            if previous is not None:
-                if len(_data[1]) == len(previous):
-                    delta = np.mean(
-                        (_data[1] - previous) ** 2 / (_data[2] ** 2 + previous_err**2)
-                    )
-                    chi2.append(delta)
-                    _asym = np.mean((_data[1] - previous) / (_data[1] + previous))
-                    asym.append(_asym)
-                    t.append(_time)
-
-                elif True:
-                    old_r = []
-                    old_err = []
-                    new_r = []
-                    new_err = []
-
-                    for i, q in enumerate(_data[0]):
-                        idx = np.argwhere(previous_q == q)
-                        # print(idx)
-                        if len(idx) > 0:
-                            new_r.append(_data[1][i])
-                            new_err.append(_data[2][i])
-                            old_r.append(previous[idx[0][0]])
-                            old_err.append(previous_err[idx[0][0]])
-
-                    old_r = np.asarray(old_r)
-                    old_err = np.asarray(old_err)
-                    new_r = np.asarray(new_r)
-                    new_err = np.asarray(new_err)
-
-                    delta = np.mean((new_r - old_r) ** 2 / (new_err**2 + old_err**2))
-                    # delta = np.mean((new_r - old_r)**2 / (new_err**2))
-                    chi2.append(delta)
-                    _asym = np.mean((new_r - old_r) / (new_r + old_r))
-                    asym.append(_asym)
-                    t.append(_time)
-
-                previous_q = _data[0]
-                previous = _data[1]
-                previous_err = _data[2]
-
-            # print("Unequal length: %s" % _file)
-            else:
-                print("Ref %s" % _file)
-                previous_q = _data[0]
-                previous = _data[1]
-                previous_err = _data[2]
+    _files = _good_files[first:last]
+    for _file, _data in zip(_files, _load_run_data(dyn_data_dir, _files)):
+        if len(_data) == 0:
+            continue
+        idx = _data[0] >= min_q
+        _data_name, _ = os.path.splitext(_file)
+        _time = int(_data_name.removeprefix(prefix))
+        compiled_array.append([_data[0][idx], _data[1][idx], _data[2][idx]])
+        compiled_times.append(_time)
+
+        if previous is not None:
+            if len(_data[1]) == len(previous):
+                delta = np.mean(
+                    (_data[1] - previous) ** 2 / (_data[2] ** 2 + previous_err**2)
+                )
+                chi2.append(delta)
+                _asym = np.mean((_data[1] - previous) / (_data[1] + previous))
+                asym.append(_asym)
+                t.append(_time)
+
+            elif True:
+                new_idx, old_idx = _match_q(previous_q, _data[0])
+                old_r = previous[old_idx]
+                old_err = previous_err[old_idx]
+                new_r = _data[1][new_idx]
+                new_err = _data[2][new_idx]
+
+                delta = np.mean((new_r - old_r) ** 2 / (new_err**2 + old_err**2))
+                # delta = np.mean((new_r - old_r)**2 / (new_err**2))
+                chi2.append(delta)
+                _asym = np.mean((new_r - old_r) / (new_r + old_r))
+                asym.append(_asym)
+                t.append(_time)
+
+            previous_q = _data[0]
+            previous = _data[1]
+            previous_err = _data[2]
+
+        # print("Unequal length: %s" % _file)
+        else:
+            print("Ref %s" % _file)
+            previous_q = _data[0]
+            previous = _data[1]
+            previous_err = _data[2]
 
     if out_array:
         # np.save(out_array, np.asarray(compiled_array))
         # np.save(out_array+'_times', np.asarray(compiled_times))
-        np.savetxt(out_array + "_chi2.txt", t)
+        np.savetxt(out_array + "_chi2.txt", chi2)
         np.savetxt(out_array + "_times.txt", t)
     print("Skipped: %s" % skipped)
     fig = plt.figure(dpi=100, figsize=[8, 4])
@@ -575,10 +633,9 @@ def package_data(
     compiled_times = []
     data_array = []
 
-    _file_list = sorted(os.listdir(dyn_data_dir))
-
     # Get only the files for the run we're interested in
-    _good_files = [_f for _f in _file_list if _f.startswith("r%d_t" % dynamic_run)]
+    prefix = "r%d_t" % dynamic_run
+    _good_files = _get_run_files(dynamic_run, dyn_data_dir)
 
     print(len(_good_files))
     asym = []
@@ -589,18 +646,17 @@ def package_data(
     min_q = qmin
     max_q = qmax
 
-    for i, _file in enumerate(_good_files[first:last]):
-        if _file.startswith("r%d_t" % dynamic_run):
-            print(_file)
-            _data = np.loadtxt(os.path.join(dyn_data_dir, _file)).T
-            if np.min(_data[0]) > min_q:
-                min_q = np.min(_data[0])
-            if np.max(_data[0]) < max_q:
-                max_q = np.max(_data[0])
+    _files = _good_files[first:last]
+    for i, (_file, _data) in enumerate(zip(_files, _load_run_data(dyn_data_dir, _files))):
+        print(_file)
+        if np.min(_data[0]) > min_q:
+            min_q = np.min(_data[0])
+        if np.max(_data[0]) < max_q:
+            max_q = np.max(_data[0])
 
-            _data_name, _ = os.path.splitext(_file)
-            _time = int(_data_name.replace("r%d_t" % dynamic_run, ""))
-            data_array.append([_data_name, _time, _data])
+        _data_name, _ = os.path.splitext(_file)
+        _time = int(_data_name.removeprefix(prefix))
+        data_array.append([_data_name, _time, _data])
 
     for i, _data in enumerate(data_array):
         idx = (_data[2][0] >= min_q) & (_data[2][0] < max_q)
@@ -636,19 +692,16 @@ def package_json_data(dynamic_run, dyn_data_dir, out_array=None):
     compiled_times = []
     data_array = []
 
-    _file_list = sorted(os.listdir(dyn_data_dir))
-
     # Get only the files for the run we're interested in
-    _good_files = [_f for _f in _file_list if _f.startswith("r%d_t" % dynamic_run)]
+    prefix = "r%d_t" % dynamic_run
+    _good_files = _get_run_files(dynamic_run, dyn_data_dir)
 
-    for i, _file in enumerate(_good_files):
-        if _file.startswith("r%d_t" % dynamic_run):
-            _data = np.loadtxt(os.path.join(dyn_data_dir, _file)).T
-            print(i, _file, len(_data[0]))
-            _data_name, _ = os.path.splitext(_file)
-            _time = int(_data_name.replace("r%d_t" % dynamic_run, ""))
-            compiled_array.append(_data.tolist())
-            compiled_times.append(_time)
+    for i, (_file, _data) in enumerate(zip(_good_files, _load_run_data(dyn_data_dir, _good_files))):
+        print(i, _file, len(_data[0]))
+        _data_name, _ = os.path.splitext(_file)
+        _time = int(_data_name.removeprefix(prefix))
+        compiled_array.append(_data.tolist())
+        compiled_times.append(_time)
 
     if out_array:
         with open(out_array, "w") as fp:
@@ -681,6 +734,7 @@ def main(
         model_name=model_name,
         first_index=first_item,
         last_index=last_item,
+        show=False,
     )
     plt.savefig(os.path.join(results_dir, "dyn-%d.png" % dynamic_run))
     plt.savefig(os.path.join(results_dir, "dyn-%d.svg" % dynamic_run))
@@ -697,6 +751,7 @@ def main(
         show_cl=True,
         model_name=model_name,
         legend_font_size=8,
+        show=False,
     )
     plt.savefig(os.path.join(results_dir, "sld-%d.png" % dynamic_run))
     plt.savefig(os.path.join(results_dir, "sld-%d.svg" % dynamic_run))
@@ -1,3 +1,13 @@
 import sys
 import os
+
+import pytest
+
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+
+@pytest.fixture(autouse=True)
+def reset_config_singleton(monkeypatch):
+    """Give every test a fresh ``get_config()`` singleton."""
+    import analyzer_tools.config_utils as config_mod
+    monkeypatch.setattr(config_mod, "_config_instance", None)
@@ -9,9 +9,6 @@ uncertainties, bounds, and an SLD profile.
 from __future__ import annotations
 
 import json
-import os
-import shutil
-import tempfile
 from pathlib import Path
 
 import numpy as np
@@ -77,36 +74,29 @@ def _populate_minimal_bumps_output(directory: Path) -> None:
 # ---------------------------------------------------------------------------
 
 
-class TestAureExport:
-    def setup_method(self):
-        self.tmp = Path(tempfile.mkdtemp())
-
-    def teardown_method(self):
-        shutil.rmtree(self.tmp)
+@pytest.fixture(scope="class")
+def exported(tmp_path_factory) -> Path:
+    """Populate and export one bumps output dir, shared by the class."""
+    directory = tmp_path_factory.mktemp("aure_export")
+    _populate_minimal_bumps_output(directory)
+    out = export_for_aure(
+        directory,
+        sample_description="50 nm Cu on Si",
+        hypothesis="oxide layer",
+        run_id="test_run",
+        fitter="dream",
+    )
+    assert out == directory
+    return directory
 
-    def test_writes_run_info_and_final_state(self):
-        _populate_minimal_bumps_output(self.tmp)
 
-        out = export_for_aure(
-            self.tmp,
-            sample_description="50 nm Cu on Si",
-            hypothesis="oxide layer",
-            run_id="test_run",
-        )
-        assert out == self.tmp
-        assert (self.tmp / "run_info.json").exists()
-        assert (self.tmp / "final_state.json").exists()
-
-    def test_run_info_contract(self):
-        _populate_minimal_bumps_output(self.tmp)
-        export_for_aure(
-            self.tmp,
-            sample_description="50 nm Cu on Si",
-            hypothesis="oxide layer",
-            run_id="test_run",
-        )
+class TestAureExport:
+    def test_writes_run_info_and_final_state(self, exported):
+        assert (exported / "run_info.json").exists()
+        assert (exported / "final_state.json").exists()
 
-        info = json.loads((self.tmp / "run_info.json").read_text())
+    def test_run_info_contract(self, exported):
+        info = json.loads((exported / "run_info.json").read_text())
         assert info["run_id"] == "test_run"
         assert info["sample_description"] == "50 nm Cu on Si"
         assert info["hypothesis"] == "oxide layer"
@@ -114,16 +104,13 @@ class TestAureExport:
         assert isinstance(info["started_at"], str)
         assert info["checkpoints"] == []
 
-    def test_final_state_contract(self):
-        _populate_minimal_bumps_output(self.tmp)
-        export_for_aure(self.tmp, sample_description="Cu/Si", fitter="dream")
-
-        doc = json.loads((self.tmp / "final_state.json").read_text())
+    def test_final_state_contract(self, exported):
+        doc = json.loads((exported / "final_state.json").read_text())
         assert doc["success"] is True
         assert doc["final_chi2"] == pytest.approx(1.45)
 
         state = doc["state"]
-        assert state["sample_description"] == "Cu/Si"
+        assert state["sample_description"] == "50 nm Cu on Si"
         assert len(state["Q"]) == 5
         assert len(state["R"]) == 5
         assert len(state["dR"]) == 5
@@ -143,14 +130,14 @@ class TestAureExport:
         assert len(fr["sld_rho"]) == 4
         assert fr["per_file_results"] is None
 
-    def test_multi_experiment_emits_per_file_results(self):
-        _write_refl(self.tmp, "problem-1-refl.dat", n=4)
-        _write_refl(self.tmp, "problem-2-refl.dat", n=4)
-        _write_profile(self.tmp, "problem-1-profile.dat")
+    def test_multi_experiment_emits_per_file_results(self, tmp_path):
+        _write_refl(tmp_path, "problem-1-refl.dat", n=4)
+        _write_refl(tmp_path, "problem-2-refl.dat", n=4)
+        _write_profile(tmp_path, "problem-1-profile.dat")
 
-        export_for_aure(self.tmp, sample_description="co-refine")
+        export_for_aure(tmp_path, sample_description="co-refine")
 
-        state = json.loads((self.tmp / "final_state.json").read_text())["state"]
+        state = json.loads((tmp_path / "final_state.json").read_text())["state"]
         assert len(state["data_files"]) == 2
         labels = [df["label"] for df in state["data_files"]]
         assert labels == ["experiment-1", "experiment-2"]
@@ -160,17 +147,17 @@ class TestAureExport:
         assert len(per_file) == 2
         assert per_file[0]["chi_squared"] is not None
 
-    def test_missing_refl_dat_returns_none(self):
+    def test_missing_refl_dat_returns_none(self, tmp_path):
         # No bumps output at all → nothing to export.
-        assert export_for_aure(self.tmp) is None
-        assert not (self.tmp / "run_info.json").exists()
+        assert export_for_aure(tmp_path) is None
+        assert not (tmp_path / "run_info.json").exists()
 
-    def test_separate_output_dir(self):
-        _populate_minimal_bumps_output(self.tmp)
-        dest = self.tmp / "aure"
-        out = export_for_aure(self.tmp, output_dir=dest)
+    def test_separate_output_dir(self, tmp_path):
+        _populate_minimal_bumps_output(tmp_path)
+        dest = tmp_path / "aure"
+        out = export_for_aure(tmp_path, output_dir=dest)
         assert out == dest
         assert (dest / "run_info.json").exists()
         assert (dest / "final_state.json").exists()
         # Bumps files stay in the source dir.
-        assert (self.tmp / "problem.par").exists()
+        assert (tmp_path / "problem.par").exists()
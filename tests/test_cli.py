@@ -10,16 +10,16 @@ from analyzer_tools.cli import main
 class TestCliMain:
     """Test the main CLI function."""
     
+    @pytest.mark.parametrize("args", [['--list-tools'], []])
     @patch('analyzer_tools.cli.print_tool_overview')
-    def test_list_tools_option(self, mock_overview):
-        """Test --list-tools option."""
+    def test_shows_tool_overview(self, mock_overview, args):
+        """--list-tools and a bare invocation both print the overview."""
         runner = CliRunner()
-        result = runner.invoke(main, ['--list-tools'])
-        
-        # Should call print_tool_overview
+        result = runner.invoke(main, args)
+
         assert result.exit_code == 0
         mock_overview.assert_called_once()
-    
+
 class TestCliHelpers:
     """Test CLI helper functions and edge cases."""
 
@@ -35,5 +35,10 @@ class TestCliIntegration:
         assert result.exit_code == 0
         assert "Neutron Reflectometry Data Analysis Tools" in result.output
 
+    def test_invalid_option_is_usage_error(self):
+        """An unknown option exits non-zero with a usage message."""
+        runner = CliRunner()
+        result = runner.invoke(main, ['--no-such-option'])
 
-
+        assert result.exit_code == 2
+        assert "No such option" in result.output
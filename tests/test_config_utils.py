@@ -6,9 +6,6 @@ Configuration is read from environment variables (optionally loaded from a
 reset the global singleton between tests.
 """
 
-import os
-from pathlib import Path
-
 import pytest
 
 import analyzer_tools.config_utils as config_mod
@@ -33,9 +30,11 @@ _ALL_KEYS = (
 
 
 @pytest.fixture(autouse=True)
-def reset_singleton(monkeypatch):
-    """Reset the global _config_instance and disable the .env cascade."""
-    monkeypatch.setattr(config_mod, "_config_instance", None)
+def isolate_env(monkeypatch):
+    """Clear analyzer env vars and disable the .env cascade.
+
+    The global ``_config_instance`` is reset by ``conftest.py``.
+    """
     for key in _ALL_KEYS:
         monkeypatch.delenv(key, raising=False)
     monkeypatch.setattr(config_mod, "_load_env", lambda dotenv_path=None: [])
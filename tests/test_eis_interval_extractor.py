@@ -3,16 +3,30 @@
 Tests for the EIS Interval Extractor module.
 """
 
+import io
 import json
 import os
-import pytest
-import tempfile
 from datetime import datetime
-from pathlib import Path
+
+import pytest
+from click.testing import CliRunner
+
+from analyzer_tools.analysis import eis_interval_extractor
+from analyzer_tools.analysis.eis_interval_extractor import (
+    extract_label_from_filename,
+    extract_per_file_intervals,
+    extract_per_frequency_intervals,
+    generate_hold_intervals,
+    main,
+    parse_mpt_header,
+    read_frequency_measurements,
+    read_measurement_columns,
+)
+from analyzer_tools.cli import eis_interval_extractor_cli
 
 
 @pytest.fixture
-def sample_mpt_file():
+def sample_mpt_file(tmp_path):
     """Create a sample .mpt file for testing."""
     content = """EC-Lab ASCII FILE
 Nb header lines : 5
@@ -23,21 +37,13 @@ freq/Hz\tRe(Z)/Ohm\t-Im(Z)/Ohm\t|Z|/Ohm\tPhase(Z)/deg\ttime/s
 6.8129269E+005\t4.5516105E+000\t-3.4436920E+000\t5.7075539E+000\t3.7110699E+001\t5.083791507944552E+02
 4.6415716E+005\t4.3242121E+000\t-2.6111193E+000\t5.0514112E+000\t3.1125132E+001\t5.087971363343167E+02
 """
-    
-    with tempfile.NamedTemporaryFile(mode='w', suffix='.mpt', delete=False, 
-                                      encoding='latin-1') as f:
-        f.write(content)
-        filepath = f.name
-    
-    yield filepath
-    
-    # Cleanup
-    if os.path.exists(filepath):
-        os.unlink(filepath)
+    filepath = tmp_path / 'sample.mpt'
+    filepath.write_text(content, encoding='latin-1')
+    return str(filepath)
 
 
 @pytest.fixture
-def sample_mpt_directory():
+def sample_mpt_directory(tmp_path):
     """Create a directory with multiple sample .mpt files for testing."""
     files_content = {
         'test_01_C02_1.mpt': """EC-Lab ASCII FILE
@@ -58,21 +64,10 @@ freq/Hz\tRe(Z)/Ohm\t-Im(Z)/Ohm\t|Z|/Ohm\tPhase(Z)/deg\ttime/s
 """,
     }
     
-    tmpdir = tempfile.mkdtemp()
-    
     for filename, content in files_content.items():
-        filepath = os.path.join(tmpdir, filename)
-        with open(filepath, 'w', encoding='latin-1') as f:
-            f.write(content)
-    
-    yield tmpdir
+        (tmp_path / filename).write_text(content, encoding='latin-1')
     
-    # Cleanup
-    for filename in files_content:
-        filepath = os.path.join(tmpdir, filename)
-        if os.path.exists(filepath):
-            os.unlink(filepath)
-    os.rmdir(tmpdir)
+    return str(tmp_path)
 
 
 class TestParseMptHeader:
@@ -80,15 +75,11 @@ class TestParseMptHeader:
     
     def test_parse_header_extracts_num_header_lines(self, sample_mpt_file):
         """Test that header line count is extracted correctly."""
-        from analyzer_tools.analysis.eis_interval_extractor import parse_mpt_header
-        
         header_info = parse_mpt_header(sample_mpt_file)
         assert header_info['num_header_lines'] == 5
     
     def test_parse_header_extracts_acquisition_time(self, sample_mpt_file):
         """Test that acquisition start time is extracted correctly."""
-        from analyzer_tools.analysis.eis_interval_extractor import parse_mpt_header
-        
         header_info = parse_mpt_header(sample_mpt_file)
         assert header_info['acquisition_start'] is not None
         assert header_info['acquisition_start'].year == 2025
@@ -97,20 +88,32 @@ class TestParseMptHeader:
     
     def test_parse_header_extracts_column_names(self, sample_mpt_file):
         """Test that column names are extracted from the header."""
-        from analyzer_tools.analysis.eis_interval_extractor import parse_mpt_header
-        
         header_info = parse_mpt_header(sample_mpt_file)
         assert 'freq/Hz' in header_info['column_names']
         assert 'time/s' in header_info['column_names']
 
+    def test_parse_header_rereads_modified_file(self, sample_mpt_file):
+        """Test that the header cache is invalidated when the file changes."""
+        header_info = parse_mpt_header(sample_mpt_file)
+        header_info['column_names'].append('mutated')
+        assert parse_mpt_header(sample_mpt_file)['num_header_lines'] == 5
+        assert 'mutated' not in parse_mpt_header(sample_mpt_file)['column_names']
+        
+        with open(sample_mpt_file, 'r', encoding='latin-1') as f:
+            content = f.read()
+        with open(sample_mpt_file, 'w', encoding='latin-1') as f:
+            f.write(content.replace('Nb header lines : 5', 'Nb header lines : 4'))
+        stat = os.stat(sample_mpt_file)
+        os.utime(sample_mpt_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        
+        assert parse_mpt_header(sample_mpt_file)['num_header_lines'] == 4
+
 
 class TestReadFrequencyMeasurements:
     """Tests for read_frequency_measurements function."""
     
     def test_returns_list(self, sample_mpt_file):
         """Test that read_frequency_measurements returns a list of dictionaries."""
-        from analyzer_tools.analysis.eis_interval_extractor import read_frequency_measurements
-        
         data = read_frequency_measurements(sample_mpt_file)
         assert isinstance(data, list)
         assert len(data) > 0
@@ -118,8 +121,6 @@ class TestReadFrequencyMeasurements:
     
     def test_has_required_fields(self, sample_mpt_file):
         """Test that returned data has all required fields."""
-        from analyzer_tools.analysis.eis_interval_extractor import read_frequency_measurements
-        
         data = read_frequency_measurements(sample_mpt_file)
         required_fields = ['frequency_hz', 'time_seconds', 'wall_clock']
         
@@ -128,30 +129,80 @@ class TestReadFrequencyMeasurements:
     
     def test_wall_clock_time_format(self, sample_mpt_file):
         """Test that wall clock time is a datetime object."""
-        from analyzer_tools.analysis.eis_interval_extractor import read_frequency_measurements
-        
         data = read_frequency_measurements(sample_mpt_file)
         wall_clock = data[0]['wall_clock']
         
         # Should be a datetime object
         assert isinstance(wall_clock, datetime)
 
+    def test_skips_malformed_rows(self, tmp_path):
+        """Test that a truncated or non-numeric row does not drop the file."""
+        content = """EC-Lab ASCII FILE
+Nb header lines : 4
+Acquisition started on : 04/20/2025 10:55:16.521
+freq/Hz\t<Ewe>/V\t|Z|/Ohm\ttime/s
+1.0E+006\t0.10\t7.28\t500.0
+6.8E+005\tn/a\t5.70\t501.0
+4.6E+005\t0.12
+"""
+        filepath = tmp_path / 'partial.mpt'
+        filepath.write_text(content, encoding='latin-1')
+        
+        data = read_frequency_measurements(str(filepath))
+        assert [m['time_seconds'] for m in data] == [500.0, 501.0]
+        assert data[0]['ewe_v'] == 0.10
+        assert data[1]['ewe_v'] is None
+        assert data[1]['z_ohm'] == 5.70
+    
+    def test_columns_reread_modified_file(self, sample_mpt_file):
+        """Test that cached columns are read-only and refreshed when the file changes."""
+        columns = read_measurement_columns(sample_mpt_file)
+        with pytest.raises(ValueError):
+            columns['time_seconds'][0] = 0.0
+        
+        with open(sample_mpt_file, 'r', encoding='latin-1') as f:
+            lines = f.readlines()
+        with open(sample_mpt_file, 'w', encoding='latin-1') as f:
+            f.writelines(lines[:-1])
+        stat = os.stat(sample_mpt_file)
+        os.utime(sample_mpt_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        
+        assert len(read_measurement_columns(sample_mpt_file)['time_seconds']) == len(columns['time_seconds']) - 1
+
+    def test_columns_cached_per_absolute_path(self, sample_mpt_file, tmp_path, monkeypatch):
+        """Test that a relative path is not served another directory's columns."""
+        other_dir = tmp_path / 'other'
+        other_dir.mkdir()
+        other_file = other_dir / 'sample.mpt'
+        with open(sample_mpt_file, 'r', encoding='latin-1') as f:
+            content = f.read()
+        # Same size and mtime, different first time value
+        other_file.write_text(
+            content.replace('5.079621700546559E+002', '6.079621700546559E+002'), encoding='latin-1'
+        )
+        stat = os.stat(sample_mpt_file)
+        os.utime(other_file, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        
+        monkeypatch.chdir(tmp_path)
+        first = read_measurement_columns('sample.mpt')
+        monkeypatch.chdir(other_dir)
+        second = read_measurement_columns('sample.mpt')
+        
+        assert first['time_seconds'][0] == pytest.approx(507.9621700546559)
+        assert second['time_seconds'][0] == pytest.approx(607.9621700546559)
+
 
 class TestExtractPerFileIntervals:
     """Tests for extract_per_file_intervals function."""
     
     def test_returns_list(self, sample_mpt_directory):
         """Test that extract_per_file_intervals returns a list."""
-        from analyzer_tools.analysis.eis_interval_extractor import extract_per_file_intervals
-        
         intervals = extract_per_file_intervals(sample_mpt_directory)
         assert isinstance(intervals, list)
         assert len(intervals) == 2  # We have 2 test files
     
     def test_interval_has_required_fields(self, sample_mpt_directory):
         """Test that intervals have required fields."""
-        from analyzer_tools.analysis.eis_interval_extractor import extract_per_file_intervals
-        
         intervals = extract_per_file_intervals(sample_mpt_directory)
         required_fields = ['filename', 'start', 'end', 'duration_seconds']
         
@@ -161,13 +212,29 @@ class TestExtractPerFileIntervals:
     
     def test_intervals_are_sorted_by_start(self, sample_mpt_directory):
         """Test that intervals are sorted by start time."""
-        from analyzer_tools.analysis.eis_interval_extractor import extract_per_file_intervals
-        
         intervals = extract_per_file_intervals(sample_mpt_directory)
         
         if len(intervals) >= 2:
             for i in range(len(intervals) - 1):
                 assert intervals[i]['start'] <= intervals[i + 1]['start']
+    
+    def test_ignores_hidden_and_excluded_files(self, sample_mpt_directory):
+        """Test that hidden files, excluded names and directories are not picked up."""
+        source = os.path.join(sample_mpt_directory, 'test_01_C02_1.mpt')
+        with open(source, encoding='latin-1') as f:
+            content = f.read()
+        for name in ['.test_03_C02_3.mpt', 'test_fit_C02_4.mpt']:
+            with open(os.path.join(sample_mpt_directory, name), 'w', encoding='latin-1') as f:
+                f.write(content)
+        os.mkdir(os.path.join(sample_mpt_directory, 'test_05_C02_5.mpt'))
+        
+        intervals = extract_per_file_intervals(sample_mpt_directory, verbose=False)
+        assert [i['filename'] for i in intervals] == ['test_01_C02_1.mpt', 'test_02_C02_2.mpt']
+    
+    def test_missing_directory_raises(self, tmp_path):
+        """Test that a missing data directory is reported as having no files."""
+        with pytest.raises(ValueError, match="No files found"):
+            extract_per_file_intervals(str(tmp_path / 'missing'))
 
 
 class TestExtractPerFrequencyIntervals:
@@ -175,8 +242,6 @@ class TestExtractPerFrequencyIntervals:
     
     def test_returns_list(self, sample_mpt_directory):
         """Test that extract_per_frequency_intervals returns a list."""
-        from analyzer_tools.analysis.eis_interval_extractor import extract_per_frequency_intervals
-        
         intervals = extract_per_frequency_intervals(sample_mpt_directory)
         assert isinstance(intervals, list)
         # Each file has 2 data rows, so we expect 4 intervals total
@@ -184,8 +249,6 @@ class TestExtractPerFrequencyIntervals:
     
     def test_interval_has_required_fields(self, sample_mpt_directory):
         """Test that intervals have required fields."""
-        from analyzer_tools.analysis.eis_interval_extractor import extract_per_frequency_intervals
-        
         intervals = extract_per_frequency_intervals(sample_mpt_directory)
         required_fields = ['filename', 'start', 'end', 'duration_seconds', 'frequency_hz', 'measurement_index']
         
@@ -195,8 +258,6 @@ class TestExtractPerFrequencyIntervals:
     
     def test_intervals_have_frequency(self, sample_mpt_directory):
         """Test that per-frequency intervals include frequency info."""
-        from analyzer_tools.analysis.eis_interval_extractor import extract_per_frequency_intervals
-        
         intervals = extract_per_frequency_intervals(sample_mpt_directory)
         
         for interval in intervals:
@@ -208,33 +269,51 @@ class TestJsonOutput:
     """Tests for JSON output functionality."""
     
     def test_save_to_json(self, sample_mpt_directory):
-        """Test that intervals can be saved to JSON."""
-        from analyzer_tools.analysis.eis_interval_extractor import extract_per_file_intervals
-        
+        """Test that _write_json writes intervals as indented JSON."""
         intervals = extract_per_file_intervals(sample_mpt_directory)
         
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
-            output_path = f.name
-        
-        try:
-            output_data = {
-                'resolution': 'per-file',
-                'source_directory': sample_mpt_directory,
-                'intervals': intervals
-            }
-            with open(output_path, 'w') as f:
-                json.dump(output_data, f, indent=2)
-            
-            # Verify the file exists and is valid JSON
-            assert os.path.exists(output_path)
-            with open(output_path, 'r') as f:
-                loaded = json.load(f)
-            
-            assert loaded['resolution'] == 'per-file'
-            assert len(loaded['intervals']) == 2
-        finally:
-            if os.path.exists(output_path):
-                os.unlink(output_path)
+        output_data = {
+            'resolution': 'per-file',
+            'source_directory': sample_mpt_directory,
+            'intervals': intervals
+        }
+        buffer = io.StringIO()
+        eis_interval_extractor._write_json(output_data, buffer)
+
+        # Verify the output round-trips as valid JSON
+        text = buffer.getvalue()
+        assert text.startswith('{\n  "resolution": "per-file"')
+        loaded = json.loads(text)
+
+        assert loaded == output_data
+
+    @pytest.mark.parametrize('backend', ['orjson', 'json'])
+    def test_main_writes_json(self, sample_mpt_directory, tmp_path, monkeypatch, backend):
+        """Test the file main writes with and without orjson."""
+        if backend == 'orjson' and eis_interval_extractor.orjson is None:
+            pytest.skip('orjson is not installed')
+        if backend == 'json':
+            monkeypatch.setattr(eis_interval_extractor, 'orjson', None)
+        # A non-ASCII file name ends up in the filename and label fields
+        os.rename(os.path.join(sample_mpt_directory, 'test_02_C02_2.mpt'),
+                  os.path.join(sample_mpt_directory, 'tést_02_C02_2.mpt'))
+        output = str(tmp_path / 'intervals.json')
+
+        result = CliRunner().invoke(
+            main, ['--data-dir', sample_mpt_directory, '--output', output, '--quiet']
+        )
+
+        assert result.exit_code == 0, result.output
+        with open(output, 'rb') as f:
+            raw = f.read()
+        # Non-ASCII characters are escaped by both backends
+        assert raw.isascii()
+        loaded = json.loads(raw)
+        assert loaded['n_intervals'] == 2
+        assert loaded['intervals'] == extract_per_file_intervals(sample_mpt_directory)
+        assert [i['filename'] for i in loaded['intervals']] == [
+            'test_01_C02_1.mpt', 'tést_02_C02_2.mpt'
+        ]
 
 
 class TestMainFunction:
@@ -242,7 +321,6 @@ class TestMainFunction:
     
     def test_main_function_exists(self):
         """Test that main CLI function exists."""
-        from analyzer_tools.analysis.eis_interval_extractor import main
         assert callable(main)
 
 
@@ -251,8 +329,6 @@ class TestGenerateHoldIntervals:
     
     def test_generates_correct_number_of_intervals(self):
         """Test that the correct number of intervals is generated."""
-        from analyzer_tools.analysis.eis_interval_extractor import generate_hold_intervals
-        
         start = datetime(2025, 4, 20, 10, 0, 0)
         end = datetime(2025, 4, 20, 10, 2, 0)  # 2 minutes = 120 seconds
         
@@ -262,8 +338,6 @@ class TestGenerateHoldIntervals:
     
     def test_interval_fields(self):
         """Test that intervals have required fields."""
-        from analyzer_tools.analysis.eis_interval_extractor import generate_hold_intervals
-        
         start = datetime(2025, 4, 20, 10, 0, 0)
         end = datetime(2025, 4, 20, 10, 1, 0)  # 1 minute
         
@@ -279,8 +353,6 @@ class TestGenerateHoldIntervals:
     
     def test_handles_partial_final_interval(self):
         """Test that partial final intervals are handled correctly."""
-        from analyzer_tools.analysis.eis_interval_extractor import generate_hold_intervals
-        
         start = datetime(2025, 4, 20, 10, 0, 0)
         end = datetime(2025, 4, 20, 10, 0, 45)  # 45 seconds
         
@@ -292,13 +364,19 @@ class TestGenerateHoldIntervals:
     
     def test_returns_empty_for_short_period(self):
         """Test that very short periods return empty list."""
-        from analyzer_tools.analysis.eis_interval_extractor import generate_hold_intervals
-        
         start = datetime(2025, 4, 20, 10, 0, 0)
         end = datetime(2025, 4, 20, 10, 0, 0, 500000)  # 0.5 seconds
         
         intervals = generate_hold_intervals(start, end, 30.0)
         assert len(intervals) == 0
+    
+    def test_rejects_non_positive_interval(self):
+        """Test that a zero interval raises instead of looping forever."""
+        start = datetime(2025, 4, 20, 10, 0, 0)
+        end = datetime(2025, 4, 20, 10, 1, 0)
+        
+        with pytest.raises(ValueError):
+            generate_hold_intervals(start, end, 0)
 
 
 class TestHoldIntervalsInPerFile:
@@ -306,8 +384,6 @@ class TestHoldIntervalsInPerFile:
     
     def test_hold_intervals_generated_for_initial_gap(self, sample_mpt_directory):
         """Test that hold intervals are generated before first EIS measurement."""
-        from analyzer_tools.analysis.eis_interval_extractor import extract_per_file_intervals
-        
         # The sample files have acquisition start at 10:55:16.521
         # but first measurement at ~10:55:16.521 + 507.96s = ~11:03:44
         # So there should be hold intervals
@@ -329,8 +405,6 @@ class TestHoldIntervalsInPerFile:
     
     def test_no_hold_intervals_without_option(self, sample_mpt_directory):
         """Test that no hold intervals are generated without the option."""
-        from analyzer_tools.analysis.eis_interval_extractor import extract_per_file_intervals
-        
         intervals = extract_per_file_intervals(
             sample_mpt_directory,
             pattern='*C02_?.mpt',
@@ -350,8 +424,6 @@ class TestExtractLabelFromFilename:
     
     def test_extracts_sequence_number(self):
         """Test that sequence number is extracted correctly."""
-        from analyzer_tools.analysis.eis_interval_extractor import extract_label_from_filename
-        
         filename = "sequence_1_CuPt_UHP1MLiBF4-d8-THF_1per-EtOH_expt11_CAs,PEIS,OCV_02_PEIS_C02_1.mpt"
         label = extract_label_from_filename(filename, pattern="*C02_?.mpt")
         
@@ -360,8 +432,6 @@ class TestExtractLabelFromFilename:
     
     def test_extracts_different_sequence_numbers(self):
         """Test that different sequence numbers are extracted correctly."""
-        from analyzer_tools.analysis.eis_interval_extractor import extract_label_from_filename
-        
         # Test sequence 5 with file number 5
         filename = "sequence_5_CuPt_expt_C02_5.mpt"
         label = extract_label_from_filename(filename, pattern="*C02_?.mpt")
@@ -371,8 +441,6 @@ class TestExtractLabelFromFilename:
     
     def test_fallback_for_non_sequence_filename(self):
         """Test fallback for filenames without sequence pattern."""
-        from analyzer_tools.analysis.eis_interval_extractor import extract_label_from_filename
-        
         filename = "some_other_filename_structure.mpt"
         label = extract_label_from_filename(filename)
         
@@ -382,8 +450,6 @@ class TestExtractLabelFromFilename:
     
     def test_eis_intervals_have_labels(self, sample_mpt_directory):
         """Test that EIS intervals have label field."""
-        from analyzer_tools.analysis.eis_interval_extractor import extract_per_file_intervals
-        
         intervals = extract_per_file_intervals(
             sample_mpt_directory,
             pattern='*C02_?.mpt',
@@ -400,9 +466,4 @@ class TestCliFunction:
     
     def test_cli_function_exists(self):
         """Test that CLI wrapper exists in cli module."""
-        from analyzer_tools.cli import eis_interval_extractor_cli
         assert callable(eis_interval_extractor_cli)
-
-
-if __name__ == '__main__':
-    pytest.main([__file__, '-v'])
@@ -0,0 +1,35 @@
+"""
+Tests for the Mantid-independent parts of the event filter module.
+"""
+
+from datetime import datetime
+
+import pytest
+
+from analyzer_tools.reduction.event_filter import parse_iso_datetime
+
+
+@pytest.mark.parametrize("iso_string, expected", [
+    ("2025-06-15T14:30:00", datetime(2025, 6, 15, 14, 30, 0)),
+    ("2025-06-15T14:30:00.123", datetime(2025, 6, 15, 14, 30, 0, 123000)),
+    ("2025-06-15T14:30:00.000001", datetime(2025, 6, 15, 14, 30, 0, 1)),
+])
+def test_parse_iso_datetime(iso_string, expected):
+    assert parse_iso_datetime(iso_string) == expected
+
+
+def test_parse_iso_datetime_matches_strptime_for_loose_forms():
+    # Non-zero-padded fields are not fixed-width but strptime accepts them
+    assert parse_iso_datetime("2025-6-5T4:30:00") == datetime(2025, 6, 5, 4, 30, 0)
+
+
+@pytest.mark.parametrize("iso_string", [
+    "invalid-date-format",
+    "2025-13-15T14:30:00",
+    "2025-06-15T14:30:00.1234567",
+    "2025-06-15T14:30:00+01:00",
+    "2025-06-15 14:30:00",
+])
+def test_parse_iso_datetime_invalid(iso_string):
+    with pytest.raises(ValueError, match="Could not parse datetime"):
+        parse_iso_datetime(iso_string)
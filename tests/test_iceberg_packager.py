@@ -4,11 +4,10 @@ Tests for the Iceberg Packager module.
 
 import json
 import os
-import tempfile
-from pathlib import Path
 
 import numpy as np
 import pandas as pd
+import pyarrow.parquet as pq
 import pytest
 
 from analyzer_tools.utils.iceberg_packager import (
@@ -26,10 +25,9 @@ from analyzer_tools.utils.iceberg_packager import (
 
 
 @pytest.fixture
-def temp_dir():
-    """Create a temporary directory for test files."""
-    with tempfile.TemporaryDirectory() as tmpdir:
-        yield tmpdir
+def temp_dir(tmp_path):
+    """Per-test directory under pytest's session base temp."""
+    return str(tmp_path)
 
 
 @pytest.fixture
@@ -118,22 +116,23 @@ def sample_reduction_json(temp_dir):
     return reduced_dir, filepath
 
 
-@pytest.fixture
-def sample_reflectivity_files(temp_dir):
-    """Create sample reflectivity data files."""
-    reduced_dir = os.path.join(temp_dir, "reduced")
-    os.makedirs(reduced_dir, exist_ok=True)
+@pytest.fixture(scope="module")
+def sample_reflectivity_files(tmp_path_factory):
+    """Create sample reflectivity data files, shared by the read-only tests."""
+    reduced_dir = str(tmp_path_factory.mktemp("reduced"))
     
     # Create sample 4-column data files
+    rng = np.random.default_rng(0)
+    labels = ["hold_initial_0", "hold_initial_1", "sequence_1_eis_1"]
+    # Each file gets a different number of points
+    all_n_points = rng.integers(50, 100, size=len(labels))
     files = []
-    for label in ["hold_initial_0", "hold_initial_1", "sequence_1_eis_1"]:
+    for label, n_points in zip(labels, all_n_points):
         filename = f"r218389_{label}.txt"
         filepath = os.path.join(reduced_dir, filename)
         
-        # Generate sample data with different number of points
-        n_points = np.random.randint(50, 100)
         Q = np.linspace(0.01, 0.05, n_points)
-        R = np.exp(-Q * 100) + np.random.normal(0, 0.01, n_points)
+        R = np.exp(-Q * 100) + rng.normal(0, 0.01, n_points)
         dR = np.abs(R) * 0.05
         dQ = Q * 0.01
         
@@ -144,9 +143,9 @@ def sample_reflectivity_files(temp_dir):
     return reduced_dir, files
 
 
-@pytest.fixture
-def sample_template_file(temp_dir):
-    """Create a sample reduction template XML file."""
+@pytest.fixture(scope="module")
+def sample_template_file(tmp_path_factory):
+    """Create a sample reduction template XML file, shared by the read-only tests."""
     template_content = """<Reduction>
  <instrument_name>REFL</instrument_name>
  <timestamp>Tuesday, 26. August 2025 03:40PM</timestamp>
@@ -160,11 +159,10 @@ def sample_template_file(temp_dir):
  </DataSeries>
 </Reduction>"""
     
-    filepath = os.path.join(temp_dir, "template.xml")
-    with open(filepath, 'w') as f:
-        f.write(template_content)
+    filepath = tmp_path_factory.mktemp("template") / "template.xml"
+    filepath.write_text(template_content)
     
-    return filepath
+    return str(filepath)
 
 
 class TestLoadSplitFile:
@@ -188,6 +186,15 @@ class TestLoadSplitFile:
         assert first_interval['label'] == "hold_initial_0"
         assert first_interval['interval_type'] == "hold"
         assert first_interval['duration_seconds'] == 30.0
+    
+    def test_load_split_file_with_nan(self, temp_dir):
+        """Test that NaN values written by json.dump are still accepted."""
+        filepath = os.path.join(temp_dir, "splits_nan.json")
+        with open(filepath, 'w') as f:
+            json.dump({"intervals": [{"label": "a", "duration_seconds": float('nan')}]}, f)
+        
+        result = load_split_file(filepath)
+        assert np.isnan(result['intervals'][0]['duration_seconds'])
 
 
 class TestLoadReductionMetadata:
@@ -228,6 +235,7 @@ class TestLoadReflectivityFile:
         
         assert len(Q) > 0
         assert len(Q) == len(R) == len(dR) == len(dQ)
+        assert Q.dtype == np.float64
         assert Q.min() > 0
         assert Q.max() < 0.1
 
@@ -311,15 +319,24 @@ class TestCreateReflectivityRecords:
         
         records = create_reflectivity_records(files, intervals, 218389)
         
-        assert len(records) == len(files)
-        for record in records:
-            assert 'run_number' in record
-            assert 'filename' in record
-            assert 'Q' in record
-            assert 'R' in record
-            assert 'dR' in record
-            assert 'dQ' in record
-            assert record['run_number'] == 218389
+        for column in ['run_number', 'filename', 'Q', 'R', 'dR', 'dQ']:
+            assert len(records[column]) == len(files)
+        assert records['run_number'] == [218389] * len(files)
+        assert records['interval_label'] == ["hold_initial_0", "hold_initial_1", "sequence_1_eis_1"]
+        assert records['hold_index'] == [0, 1, None]
+        assert len(records['Q'][0]) == records['n_points'][0]
+        assert records['Q'][0].dtype == np.float32
+    
+    def test_extrema_keep_file_values(self, sample_reflectivity_files):
+        """Test that Q/R extrema are not rounded through float32."""
+        reduced_dir, files = sample_reflectivity_files
+        
+        records = create_reflectivity_records(files[:1], [], 218389)
+        
+        Q, R, _, _ = load_reflectivity_file(files[0])
+        assert records['Q_min'] == [0.01]
+        assert records['Q_max'] == [0.05]
+        assert records['R_max'] == [R.max()]
 
 
 class TestValidateInputs:
@@ -389,12 +406,13 @@ class TestPackageToParquet:
             json.dump(reduction_data, f)
         
         # Create reflectivity files
+        rng = np.random.default_rng(0)
         for label in ["hold_initial_0", "hold_initial_1"]:
             filepath = os.path.join(reduced_dir, f"r218389_{label}.txt")
             data = np.column_stack([
                 np.linspace(0.01, 0.05, 50),  # Q
-                np.random.rand(50),            # R
-                np.random.rand(50) * 0.05,     # dR
+                rng.random(50),                # R
+                rng.random(50) * 0.05,         # dR
                 np.ones(50) * 0.0004           # dQ
             ])
             np.savetxt(filepath, data)
@@ -428,3 +446,16 @@ class TestPackageToParquet:
         assert len(metadata_df) == 1
         assert metadata_df['run_number'].iloc[0] == 218389
         assert 'reduction_template_xml' in metadata_df.columns
+    
+    def test_package_writes_row_group_per_batch(self, sample_split_file, sample_reflectivity_files,
+                                                sample_template_file, temp_dir, monkeypatch):
+        """Test that files are written in batches of FILES_PER_ROW_GROUP."""
+        monkeypatch.setattr('analyzer_tools.utils.iceberg_packager.FILES_PER_ROW_GROUP', 2)
+        reduced_dir, files = sample_reflectivity_files
+        output_file = os.path.join(temp_dir, "batched.parquet")
+        
+        result = package_to_parquet(sample_split_file, reduced_dir, sample_template_file, output_file)
+        
+        parquet_file = pq.ParquetFile(result)
+        assert parquet_file.num_row_groups == 2
+        assert parquet_file.metadata.num_rows == len(files)
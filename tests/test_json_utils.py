@@ -0,0 +1,35 @@
+"""
+Tests for the shared JSON helpers.
+"""
+
+import math
+
+import pytest
+
+from analyzer_tools.utils import json_utils
+
+
+@pytest.fixture(params=["orjson", "json"])
+def backend(request, monkeypatch):
+    if request.param == "orjson" and json_utils.orjson is None:
+        pytest.skip("orjson is not installed")
+    if request.param == "json":
+        monkeypatch.setattr(json_utils, "orjson", None)
+    return request.param
+
+
+def test_read_json(tmp_path, backend):
+    path = tmp_path / "data.json"
+    path.write_text('{"label": "Cu", "values": [1, 2.5]}')
+
+    assert json_utils.read_json(str(path)) == {"label": "Cu", "values": [1, 2.5]}
+
+
+def test_read_json_accepts_nan(tmp_path, backend):
+    path = tmp_path / "problem-err.json"
+    path.write_text('{"Cu thickness": {"std": NaN, "mean": 1.0}}')
+
+    data = json_utils.read_json(str(path))
+
+    assert math.isnan(data["Cu thickness"]["std"])
+    assert data["Cu thickness"]["mean"] == 1.0
@@ -1,27 +1,26 @@
 import pytest
 import os
-import tempfile
-import shutil
 import numpy as np
-from unittest.mock import patch, MagicMock
+from pathlib import Path
+from unittest.mock import patch
 from analyzer_tools.analysis import partial_data_assessor
 
+SAMPLE_PARTIAL_DIR = Path(__file__).parent / 'sample_data' / 'partial'
+
 class TestPartialDataAssessor:
-    def setup_method(self):
-        self.test_dir = tempfile.mkdtemp()
+    @pytest.fixture(autouse=True)
+    def _dirs(self, tmp_path):
+        self.test_dir = str(tmp_path)
         self.reports_dir = os.path.join(self.test_dir, 'reports')
         os.makedirs(self.reports_dir)
         self.data_dir = os.path.join(self.test_dir, 'data')
         os.makedirs(self.data_dir)
 
-    def teardown_method(self):
-        shutil.rmtree(self.test_dir)
-
     @patch('matplotlib.pyplot.savefig')
     def test_assess_data_set_creates_report_with_metrics(self, mock_savefig):
         # Arrange
         set_id = '218281'
-        data_dir = os.path.abspath('tests/sample_data/partial')
+        data_dir = str(SAMPLE_PARTIAL_DIR)
 
         # Act
         partial_data_assessor.assess_data_set(set_id, data_dir, self.reports_dir)
@@ -115,7 +114,3 @@ class TestPartialDataAssessor:
         # Test with empty or insufficient data
         assert partial_data_assessor.find_overlap_regions([]) == []
         assert partial_data_assessor.find_overlap_regions([np.array([[0.01, 1.0, 0.1, 0.001]])]) == []
-
-
-if __name__ == "__main__":
-    pytest.main()
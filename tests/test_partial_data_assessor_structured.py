@@ -3,7 +3,6 @@
 from __future__ import annotations
 
 import json
-import os
 from pathlib import Path
 from unittest.mock import patch
 
@@ -11,10 +10,12 @@ import pytest
 
 from analyzer_tools.analysis import partial_data_assessor as pda
 
+SAMPLE_PARTIAL_DIR = Path(__file__).parent / "sample_data" / "partial"
+
 
 @pytest.fixture
 def sample_partial_dir() -> str:
-    return os.path.abspath("tests/sample_data/partial")
+    return str(SAMPLE_PARTIAL_DIR)
 
 
 @patch("matplotlib.pyplot.savefig")
@@ -2,8 +2,6 @@
 Tests for analyzer_tools.registry module.
 """
 
-from unittest.mock import patch
-
 from analyzer_tools.registry import (
     ToolInfo, TOOLS, WORKFLOWS, 
     get_all_tools, get_tool, get_tools_by_data_type, 
@@ -1,25 +1,36 @@
 import pytest
 import os
-import tempfile
-import shutil
 import json
 import numpy as np
+from types import SimpleNamespace
 from unittest.mock import patch, MagicMock
 from click.testing import CliRunner
-from analyzer_tools.analysis import result_assessor
+
+
+@pytest.fixture
+def result_assessor():
+    # Deferred so collecting this module doesn't pull in refl1d/bumps.
+    from analyzer_tools.analysis import result_assessor
+    return result_assessor
+
+
+@pytest.fixture
+def plot_mocks(monkeypatch):
+    """Stub out figure saving and SLD plotting."""
+    mocks = SimpleNamespace(savefig=MagicMock(), plot_sld=MagicMock())
+    monkeypatch.setattr('matplotlib.pyplot.savefig', mocks.savefig)
+    monkeypatch.setattr('analyzer_tools.utils.summary_plots.plot_sld', mocks.plot_sld)
+    return mocks
+
 
 class TestResultAssessor:
-    def setup_method(self):
-        self.test_dir = tempfile.mkdtemp()
+    @pytest.fixture(autouse=True)
+    def _dirs(self, tmp_path):
+        self.test_dir = str(tmp_path)
         self.reports_dir = os.path.join(self.test_dir, 'reports')
         os.makedirs(self.reports_dir)
 
-    def teardown_method(self):
-        shutil.rmtree(self.test_dir)
-
-    @patch('matplotlib.pyplot.savefig')
-    @patch('analyzer_tools.utils.summary_plots.plot_sld')
-    def test_assess_result_creates_files_and_report(self, mock_plot_sld, mock_savefig):
+    def test_assess_result_creates_files_and_report(self, plot_mocks, result_assessor):
         # Arrange
         set_id = '123'
         model_name = 'test_model'
@@ -47,12 +58,37 @@ class TestResultAssessor:
         assert f'![Fit result](fit_result_fit_results_reflectivity.svg)' in report_content
         assert f'![SLD profile](fit_result_fit_results_profile.svg)' in report_content
 
-        assert mock_savefig.call_count == 2
-        mock_plot_sld.assert_called_once()
+        assert plot_mocks.savefig.call_count == 2
+        plot_mocks.plot_sld.assert_called_once()
+
+    def test_assess_result_replaces_fit_results_section(self, plot_mocks, result_assessor):
+        fit_results_dir = os.path.join(self.test_dir, 'fit_results')
+        os.makedirs(fit_results_dir)
+        refl_data = np.array([[1, 2, 3], [1, 2, 3], [1, 2, 3], [0.1, 0.1, 0.1], [1, 2, 3]]).T
+        np.savetxt(os.path.join(fit_results_dir, 'test-refl.dat'), refl_data)
+        np.savetxt(os.path.join(fit_results_dir, 'problem-1-profile.dat'), np.array([[1, 2], [3, 4]]))
 
-    @patch('matplotlib.pyplot.savefig')
-    @patch('analyzer_tools.utils.summary_plots.plot_sld')
-    def test_assess_result_with_json_files(self, mock_plot_sld, mock_savefig):
+        result_assessor.assess_result(fit_results_dir, self.reports_dir)
+        result_assessor.assess_result(fit_results_dir, self.reports_dir)
+
+        with open(os.path.join(self.reports_dir, 'report_fit_results.md')) as f:
+            report_content = f.read()
+        assert report_content.count(result_assessor._FIT_RESULTS_HEADER) == 1
+
+    def test_aure_section_is_replaced(self, result_assessor):
+        report_path = os.path.join(self.reports_dir, 'report.md')
+        with open(report_path, 'w') as f:
+            f.write('# Report\n')
+
+        result_assessor.append_aure_section_to_report(report_path, {'error': 'first'})
+        result_assessor.append_aure_section_to_report(report_path, {'error': 'second'})
+
+        with open(report_path) as f:
+            report_content = f.read()
+        assert report_content.count(result_assessor._AURE_HEADER) == 1
+        assert 'second' in report_content and 'first' not in report_content
+
+    def test_assess_result_with_json_files(self, plot_mocks, result_assessor):
         # Arrange
         set_id = '218281'
         model_name = 'cu_thf'
@@ -123,9 +159,7 @@ Cu thickness 500.102"""
         assert '0.95' in report_content  # Min value from bounds
         assert '1.05' in report_content  # Max value from bounds
 
-    @patch('matplotlib.pyplot.savefig')
-    @patch('analyzer_tools.utils.summary_plots.plot_sld')
-    def test_assess_result_with_malformed_json(self, mock_plot_sld, mock_savefig):
+    def test_assess_result_with_malformed_json(self, plot_mocks, result_assessor):
         # Arrange
         set_id = '456'
         model_name = 'test_model'
@@ -149,9 +183,7 @@ Cu thickness 500.102"""
         report_path = os.path.join(self.reports_dir, f'report_fit_results.md')
         assert os.path.exists(report_path)
 
-    @patch('matplotlib.pyplot.savefig')
-    @patch('analyzer_tools.utils.summary_plots.plot_sld')
-    def test_assess_result_no_data_file(self, mock_plot_sld, mock_savefig):
+    def test_assess_result_no_data_file(self, plot_mocks, result_assessor):
         # Arrange
         set_id = '789'
         model_name = 'test_model'
@@ -163,10 +195,10 @@ Cu thickness 500.102"""
         result_assessor.assess_result(fit_results_dir, self.reports_dir)
 
         # Assert - should handle missing files gracefully
-        assert mock_savefig.call_count == 0
-        assert mock_plot_sld.call_count == 0
+        assert plot_mocks.savefig.call_count == 0
+        assert plot_mocks.plot_sld.call_count == 0
 
-    def test_main_function(self):
+    def test_main_function(self, result_assessor):
         # Test the main function with minimal arguments
         runner = CliRunner()
         
@@ -187,6 +219,3 @@ Cu thickness 500.102"""
                 
                 assert result.exit_code == 0, f"CLI failed: {result.output}"
                 mock_assess.assert_called_once()
-
-if __name__ == "__main__":
-    pytest.main()
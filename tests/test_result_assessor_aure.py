@@ -3,16 +3,20 @@
 from __future__ import annotations
 
 import json
-import subprocess
 from pathlib import Path
-from unittest.mock import MagicMock, patch
+from unittest.mock import MagicMock
 
-from click.testing import CliRunner
+import pytest
 
-from analyzer_tools.analysis import result_assessor as ra
 
+@pytest.fixture
+def ra():
+    # Deferred so collecting this module doesn't pull in refl1d/bumps.
+    from analyzer_tools.analysis import result_assessor
+    return result_assessor
 
-def test_render_aure_section_with_issues_and_suggestions() -> None:
+
+def test_render_aure_section_with_issues_and_suggestions(ra) -> None:
     evaluation = {
         "verdict": "acceptable",
         "chi2": 1.23,
@@ -30,13 +34,13 @@ def test_render_aure_section_with_issues_and_suggestions() -> None:
     assert "Fit is acceptable" in md
 
 
-def test_render_aure_section_error() -> None:
+def test_render_aure_section_error(ra) -> None:
     md = ra._render_aure_section({"error": "boom"})
     assert "boom" in md
     assert "## LLM Evaluation (AuRE)" in md
 
 
-def test_append_aure_section_creates_file(tmp_path: Path) -> None:
+def test_append_aure_section_creates_file(ra, tmp_path: Path) -> None:
     report = tmp_path / "report_1.md"
     report.write_text("# Report for Set 1\n\n## Fit Result Assessment\nfoo\n")
     ra.append_aure_section_to_report(
@@ -54,12 +58,12 @@ def test_append_aure_section_creates_file(tmp_path: Path) -> None:
     assert "poor" in content
 
 
-def test_run_aure_evaluate_no_aure(monkeypatch) -> None:
+def test_run_aure_evaluate_no_aure(ra, monkeypatch) -> None:
     monkeypatch.setattr(ra.shutil, "which", lambda _cmd: None)
     assert ra.run_aure_evaluate("some_dir") is None
 
 
-def test_run_aure_evaluate_parses_json(monkeypatch, tmp_path: Path) -> None:
+def test_run_aure_evaluate_parses_json(ra, monkeypatch, tmp_path: Path) -> None:
     monkeypatch.setattr(ra.shutil, "which", lambda _cmd: "/usr/bin/aure")
     payload = {"verdict": "acceptable", "chi2": 1.5, "issues": [], "suggestions": []}
     fake_result = MagicMock()
@@ -72,7 +76,7 @@ def test_run_aure_evaluate_parses_json(monkeypatch, tmp_path: Path) -> None:
     assert result == payload
 
 
-def test_run_aure_evaluate_non_json(monkeypatch, tmp_path: Path) -> None:
+def test_run_aure_evaluate_non_json(ra, monkeypatch, tmp_path: Path) -> None:
     monkeypatch.setattr(ra.shutil, "which", lambda _cmd: "/usr/bin/aure")
     fake_result = MagicMock()
     fake_result.returncode = 0
@@ -0,0 +1,256 @@
+"""
+Tests for the dynamic-data helpers in summary_plots.
+"""
+
+import json
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from analyzer_tools.utils import summary_plots
+
+
+@pytest.fixture
+def dyn_data_dir(tmp_path):
+    """Directory with time-resolved files for two runs and a fit folder."""
+    q = np.linspace(0.01, 0.1, 10)
+    for run, times in [(123, [0, 30, 60]), (456, [0])]:
+        for t in times:
+            data = np.column_stack([q, np.exp(-q * (t + 10)), 0.01 * np.ones_like(q)])
+            np.savetxt(tmp_path / f"r{run}_t{t:05d}.txt", data)
+    (tmp_path / "r123_t99999").mkdir()
+    return tmp_path
+
+
+def test_get_run_files(dyn_data_dir):
+    files = summary_plots._get_run_files(123, str(dyn_data_dir))
+
+    assert files == ["r123_t00000.txt", "r123_t00030.txt", "r123_t00060.txt"]
+
+
+def test_match_q_keeps_order_and_first_match():
+    previous_q = np.array([0.3, 0.1, 0.2, 0.1])
+    q = np.array([0.1, 0.4, 0.2, 0.1])
+
+    new_idx, old_idx = summary_plots._match_q(previous_q, q)
+
+    assert new_idx.tolist() == [0, 2, 3]
+    assert old_idx.tolist() == [1, 2, 1]
+
+
+def test_detect_changes_unequal_lengths(dyn_data_dir):
+    # Drop the first point of the last slice so only the shared Q values
+    # are compared against the previous one.
+    last = dyn_data_dir / "r123_t00060.txt"
+    data = np.loadtxt(last)
+    np.savetxt(last, data[1:])
+    previous = np.loadtxt(dyn_data_dir / "r123_t00030.txt")
+
+    t, chi2 = summary_plots.detect_changes(123, str(dyn_data_dir), last=None)
+
+    expected = np.mean(
+        (data[1:, 1] - previous[1:, 1]) ** 2 / (data[1:, 2] ** 2 + previous[1:, 2] ** 2)
+    )
+    assert t == [30, 60]
+    assert chi2[1] == pytest.approx(expected)
+
+
+def test_package_data_keeps_file_order(dyn_data_dir):
+    times, data = summary_plots.package_data(123, str(dyn_data_dir), last=None)
+
+    assert times.tolist() == [0, 30, 60]
+    # The upper Q bound is exclusive, so the last point of each file is cut
+    assert data.shape == (3, 3, 9)
+    expected = np.loadtxt(dyn_data_dir / "r123_t00030.txt").T
+    np.testing.assert_allclose(data[1], expected[:, :-1])
+
+
+def test_write_md_table(tmp_path):
+    trend_file = tmp_path / "trend-model.json"
+    trend_file.write_text(json.dumps([
+        [0, 30],
+        {"sei thickness": [10.0, 12.5], "sei rho": [1.234, 1.5]},
+        {"sei thickness": [0.5, 0.25], "sei rho": [0.01, 0.02]},
+        [1.1, 1.2],
+    ]))
+
+    summary_plots.write_md_table(str(trend_file))
+
+    table = (tmp_path / "trend-model-table.md").read_text(encoding="utf-8")
+    assert table == (
+        "| Time | sei thickness|sei rho| chi2 |\n"
+        "| ---|---|---|---|\n"
+        "| 0 | 10.00 ± 0.50 | 1.23 ± 0.01 | 1.1 |\n"
+        "| 30 | 12.50 ± 0.25 | 1.50 ± 0.02 | 1.2 |\n"
+    )
+
+
+def test_layer_parameter_values_keeps_shared_names():
+    def par(name, value):
+        return SimpleNamespace(name=name, value=value)
+
+    def layer(prefix, rho, thickness):
+        material = SimpleNamespace(rho=par(f"{prefix} rho", rho), irho=par(f"{prefix} irho", 0.0))
+        return SimpleNamespace(
+            material=material,
+            thickness=par(f"{prefix} thickness", thickness),
+            interface=par("roughness", 5.0),
+        )
+
+    expt = SimpleNamespace(sample=SimpleNamespace(layers=[layer("Cu", 6.4, 500.0), layer("Ti", -1.9, 40.0)]))
+
+    values = summary_plots._layer_parameter_values(expt)
+
+    assert values["Cu thickness"] == [500.0]
+    assert values["Ti rho"] == [-1.9]
+    assert values["roughness"] == [5.0, 5.0]
+
+
+def test_detect_changes_writes_chi2_and_times(dyn_data_dir, tmp_path):
+    out_array = str(tmp_path / "changes")
+
+    t, chi2 = summary_plots.detect_changes(123, str(dyn_data_dir), last=None, out_array=out_array)
+
+    np.testing.assert_allclose(np.loadtxt(out_array + "_times.txt"), t)
+    np.testing.assert_allclose(np.loadtxt(out_array + "_chi2.txt"), chi2)
+
+
+@pytest.mark.skipif(not summary_plots.HAS_BUMPS, reason="bumps is not installed")
+def test_sld_contour_is_cached_per_chain(monkeypatch):
+    calls = []
+
+    def get_sld_contour(problem, state, cl=90, align=-1):
+        calls.append(state)
+        return [np.zeros((4, 5))]
+
+    monkeypatch.setattr(summary_plots.model_utils, "expt_from_json_file", lambda *a, **k: None)
+    monkeypatch.setattr(summary_plots, "FitProblem", lambda expt: None)
+    monkeypatch.setattr(summary_plots.dream.state, "load_state", lambda path: path)
+    monkeypatch.setattr(summary_plots.model_utils, "get_sld_contour", get_sld_contour)
+    summary_plots._sld_contour.cache_clear()
+
+    first = summary_plots._sld_contour("fit-expt.json", "fit", (1, 10), (1, 100))
+    again = summary_plots._sld_contour("fit-expt.json", "fit", (1, 10), (1, 100))
+    # A new chain or an edited expt file are both recomputed
+    summary_plots._sld_contour("fit-expt.json", "fit", (1, 10), (2, 100))
+    summary_plots._sld_contour("fit-expt.json", "fit", (2, 12), (1, 100))
+    summary_plots._sld_contour.cache_clear()
+
+    assert again is first
+    assert not first.flags.writeable
+    assert calls == ["fit", "fit", "fit"]
+
+
+@pytest.mark.skipif(not summary_plots.HAS_BUMPS, reason="bumps is not installed")
+def test_plot_sld_trims_flat_tail(tmp_path, monkeypatch):
+    profile_file = tmp_path / "fit-profile.dat"
+    np.savetxt(profile_file, np.zeros((2, 2)))
+    (tmp_path / "fit-chain.mc").write_text("")
+    (tmp_path / "fit-expt.json").write_text("{}")
+    z = np.arange(6.0)
+    best = np.array([1.0, 2.0, 3.0, 3.0005, 3.0005, 3.0005])
+    contour = np.vstack([z, best, best - 0.1, best + 0.1])
+    monkeypatch.setattr(summary_plots, "_sld_contour", lambda *args: contour)
+
+    summary_plots.plot_sld(str(profile_file), "fit")
+
+    line = summary_plots.plt.gca().lines[-1]
+    summary_plots.plt.close("all")
+    # The last step above 0.001 is between the 2nd and 3rd points
+    np.testing.assert_allclose(line.get_ydata(), [1.0, 2.0])
+
+
+@pytest.mark.skipif(not summary_plots.HAS_BUMPS, reason="bumps is not installed")
+def test_plot_sld_keys_contour_on_expt_file(tmp_path, monkeypatch):
+    profile_file = tmp_path / "fit-profile.dat"
+    np.savetxt(profile_file, np.zeros((2, 2)))
+    (tmp_path / "fit-chain.mc").write_text("")
+    expt_file = tmp_path / "fit-expt.json"
+    keys = []
+
+    def sld_contour(*args):
+        keys.append(args)
+        return np.zeros((4, 5))
+
+    monkeypatch.setattr(summary_plots, "_sld_contour", sld_contour)
+
+    expt_file.write_text("{}")
+    summary_plots.plot_sld(str(profile_file), "fit")
+    expt_file.write_text('{"edited": true}')
+    summary_plots.plot_sld(str(profile_file), "fit")
+    summary_plots.plt.close("all")
+
+    assert keys[0][:2] == (str(expt_file), str(tmp_path / "fit"))
+    assert keys[0][2] != keys[1][2]
+    assert keys[0][3] == keys[1][3]
+
+
+@pytest.mark.skipif(not summary_plots.HAS_BUMPS, reason="bumps is not installed")
+def test_plot_sld_keys_contour_on_absolute_paths(tmp_path, monkeypatch):
+    for name in ["a", "b"]:
+        fit_dir = tmp_path / name
+        fit_dir.mkdir()
+        np.savetxt(fit_dir / "fit-profile.dat", np.zeros((2, 2)))
+        (fit_dir / "fit-chain.mc").write_text("")
+        (fit_dir / "fit-expt.json").write_text("{}")
+    keys = []
+
+    def sld_contour(*args):
+        keys.append(args)
+        return np.zeros((4, 5))
+
+    monkeypatch.setattr(summary_plots, "_sld_contour", sld_contour)
+
+    # The same relative path points to a different fit after a chdir
+    for name in ["a", "b"]:
+        monkeypatch.chdir(tmp_path / name)
+        summary_plots.plot_sld("fit-profile.dat", "fit")
+    summary_plots.plt.close("all")
+
+    assert keys[0][:2] == (str(tmp_path / "a" / "fit-expt.json"), str(tmp_path / "a" / "fit"))
+    assert keys[1][:2] == (str(tmp_path / "b" / "fit-expt.json"), str(tmp_path / "b" / "fit"))
+
+
+def test_plot_dyn_data_without_show(dyn_data_dir, monkeypatch):
+    def fail():
+        raise AssertionError("plt.show() should not be called")
+
+    monkeypatch.setattr(summary_plots.plt, "show", fail)
+
+    file_list = summary_plots.plot_dyn_data(
+        123, "missing", "missing", dyn_data_dir=str(dyn_data_dir),
+        dyn_fit_dir=str(dyn_data_dir), last_index=None, show=False,
+    )
+    summary_plots.plt.close("all")
+
+    assert [entry[0] for entry in file_list] == [0, 30, 60]
+
+
+def test_plot_dyn_data_single_slice(dyn_data_dir):
+    file_list = summary_plots.plot_dyn_data(
+        456, "missing", "missing", dyn_data_dir=str(dyn_data_dir),
+        dyn_fit_dir=str(dyn_data_dir), last_index=None, show=False,
+    )
+    labels = summary_plots.plt.gca().get_legend_handles_labels()[1]
+    summary_plots.plt.close("all")
+
+    assert file_list == [[0, "r456_t00000", "r456_t00000"]]
+    assert labels == ["0 < t < 0 s"]
+
+
+def test_plot_dyn_data_ignores_files_outside_slice(tmp_path):
+    q = np.linspace(0.01, 0.1, 10)
+    data = np.column_stack([q, np.exp(-q), 0.01 * np.ones_like(q)])
+    for name in ["r5_t0", "r5_t30", "r5_t60", "r5_tnotes"]:
+        np.savetxt(tmp_path / f"{name}.txt", data)
+
+    file_list = summary_plots.plot_dyn_data(
+        5, "missing", "missing", first_index=0, last_index=2,
+        dyn_data_dir=str(tmp_path), dyn_fit_dir=str(tmp_path), show=False,
+    )
+    labels = summary_plots.plt.gca().get_legend_handles_labels()[1]
+    summary_plots.plt.close("all")
+
+    assert [entry[0] for entry in file_list] == [0, 30]
+    assert labels == ["0 < t < 30 s", "30 < t < 60 s"]